@@ -0,0 +1,81 @@
+"""
+Findings Baseline
+Sorted fingerprint set of accepted findings; scans report only what is not in it
+"""
+
+import json
+import os
+
+from findings import normalize_path
+
+DEFAULT_BASELINE_PATH = '.security-baseline.json'
+
+# Bump when the file layout or the fingerprint recipe (sarif_writer.FINGERPRINT_NAME)
+# changes, so a stale baseline is rejected instead of silently matching nothing
+BASELINE_FORMAT_VERSION = 2
+
+
+class Baseline:
+    """Fingerprints of accepted findings, checked with set lookups as files are scanned
+
+    ``entries`` maps each fingerprint to the rule and file it came from, so
+    findings that disappear can be reported as resolved by name. Every
+    fingerprint computed during the run is kept in ``current`` as well, which
+    is what ``save`` writes when the baseline is regenerated.
+    """
+
+    def __init__(self, entries=None):
+        self.entries = entries or {}
+        self.current = {}
+        self.scanned = set()
+        self.matched = 0
+        # True when only part of the tree is scanned (diff mode), so findings
+        # in files outside the scan are not resolved
+        self.partial = False
+
+    @classmethod
+    def load(cls, path):
+        """Baseline stored by ``save``; a missing file is an empty baseline"""
+        if not os.path.exists(path):
+            print(f"No baseline at {path}, every finding is new")
+            return cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != BASELINE_FORMAT_VERSION:
+            raise ValueError(f"Baseline {path} has version {data.get('version')}, expected {BASELINE_FORMAT_VERSION}")
+        return cls(data.get('fingerprints', {}))
+
+    def save(self, path):
+        """Write every finding seen this run as the new baseline, sorted by fingerprint"""
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': BASELINE_FORMAT_VERSION, 'fingerprints': self.current},
+                      f, indent=2, sort_keys=True)
+            f.write('\n')
+        os.replace(tmp_path, path)
+        return len(self.current)
+
+    def check_file(self, file_path, findings):
+        """Whether each of one file's report findings is new, in order
+
+        Findings carry the fingerprint the SARIF writer reports as well
+        (sarif_writer.finding_fingerprint), numbered by the scanner before any
+        finding is filtered out.
+        """
+        self.scanned.add(normalize_path(file_path))
+        new = []
+        for finding in findings:
+            fingerprint = finding['fingerprint']
+            self.current[fingerprint] = {'rule': finding['rule'], 'file': normalize_path(finding['file'])}
+            known = fingerprint in self.entries
+            self.matched += known
+            new.append(not known)
+        return new
+
+    def resolved(self):
+        """Baselined findings not seen this run, sorted by file and rule"""
+        resolved = [
+            dict(entry, fingerprint=fingerprint) for fingerprint, entry in self.entries.items()
+            if fingerprint not in self.current and (not self.partial or entry['file'] in self.scanned)
+        ]
+        return sorted(resolved, key=lambda entry: (entry['file'], entry['rule'], entry['fingerprint']))
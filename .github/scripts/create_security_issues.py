@@ -6,23 +6,67 @@ Creates GitHub issues from security scan results
 
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from github import Github
 
-
-def create_issue_from_finding(repo, finding):
-    """Create a GitHub issue from a security finding"""
-    severity = finding.get('severity', 'MEDIUM').upper()
-    rule_name = finding.get('rule', 'security-issue')
-    file_path = finding.get('file', 'unknown')
-    line_number = finding.get('line', 0)
-    description = finding.get('description', 'Security vulnerability detected')
-    cwe = finding.get('cwe', 'CWE-000')
-    context = finding.get('context', finding.get('match', 'Code snippet not available'))
+import security_config
+from finding_groups import DEFAULT_GROUP_BY, group_findings, parse_group_by
+from github_api import DEFAULT_API_URL, DEFAULT_WRITE_INTERVAL, GitHubClient, RateLimiter
+from issue_index import IssueIndex, key_marker
+from tool_results import TOOLS, bandit_filter, iter_tool_findings
+
+# Issues created in parallel; writes are still paced by the rate limiter
+DEFAULT_WORKERS = 4
+
+# Rows past this are summarized, keeping bodies well under GitHub's 65536 character limit
+DEFAULT_MAX_LOCATIONS = 100
+SNIPPET_LENGTH = 80
+
+
+def cwe_link(cwe):
+    """Markdown link to a CWE entry"""
+    return f"[CWE Details: {cwe}](https://cwe.mitre.org/data/definitions/{cwe.split('-')[1] if '-' in cwe else '000'}.html)"
+
+
+def table_cell(text):
+    """Single-line, length-limited text that cannot break a Markdown table"""
+    text = ' '.join(str(text).split())
+    if len(text) > SNIPPET_LENGTH:
+        text = text[:SNIPPET_LENGTH - 3] + '...'
+    return text.replace('|', '\\|').replace('`', "'")
+
+
+def issue_from_group(group, max_locations=DEFAULT_MAX_LOCATIONS):
+    """Title, body and labels of the GitHub issue for a group of security findings"""
+    findings = group.locations()
+    first = findings[0]
+    severity = group.severity
+    rules = group.distinct('rule')
+    files = group.distinct('file')
+    cwes = group.distinct('cwe')
+
+    if len(rules) == 1:
+        description = first.get('description', 'Security vulnerability detected')
+    elif len(cwes) == 1:
+        description = f"{cwes[0]} findings from {len(rules)} rules"
+    else:
+        description = f"Security findings from {len(rules)} rules"
+
+    if len(files) == 1:
+        scope = os.path.basename(files[0])
+        component = f"`{files[0]}`" + (f" (Line {first.get('line', 0)})" if len(findings) == 1 else '')
+    elif 'directory' in group.fields:
+        scope = f"{group.fields['directory']}/"
+        component = f"`{scope}`"
+    else:
+        scope = component = f"{len(files)} files"
 
     # Create issue title
-    title = f"[SECURITY] [{severity}] {description} - {os.path.basename(file_path)}"
+    title = f"[SECURITY] [{severity}] {description} - {scope}"
+    if len(findings) > 1:
+        title += f" ({len(findings)} locations)"
 
     # Map severity to priority emoji
     priority_map = {
@@ -33,14 +77,34 @@ def create_issue_from_finding(repo, finding):
     }
     priority = priority_map.get(severity, '🟡 Medium')
 
+    rows = [
+        f"| `{finding.get('file', 'unknown')}` | {finding.get('line', 0)} | {finding.get('rule', 'security-issue')} "
+        f"| `{table_cell(finding.get('match', ''))}` |"
+        for finding in findings[:max_locations]
+    ]
+    if len(findings) > max_locations:
+        rows.append(f"| ... | | | {len(findings) - max_locations} more locations not shown |")
+    locations = '\n'.join(rows)
+
+    context = ''
+    if len(findings) == 1:
+        context = f"""
+```
+{first.get('context', first.get('match', 'Code snippet not available'))}
+```
+"""
+
+    references = '\n'.join(f"- {cwe_link(cwe)}" for cwe in cwes)
+
     # Create detailed issue body
     body = f"""## 🔒 Security Vulnerability Report
 
 ### Vulnerability Summary
 **Severity**: {priority}
-**CWE ID**: {cwe}
-**Component**: `{file_path}` (Line {line_number})
-**Detection Rule**: {rule_name}
+**CWE ID**: {', '.join(cwes)}
+**Component**: {component}
+**Detection Rule**: {', '.join(rules)}
+**Locations**: {len(findings)}
 
 ### Description
 {description}
@@ -56,14 +120,11 @@ def create_issue_from_finding(repo, finding):
 - Data integrity concerns
 - System availability risk
 
-### Location and Context
-**File**: `{file_path}`
-**Line**: {line_number}
-
-```
+### Locations
+| File | Line | Rule | Match |
+|------|------|------|-------|
+{locations}
 {context}
-```
-
 ### Remediation Steps
 
 #### Immediate Actions (Priority 1)
@@ -92,99 +153,102 @@ def create_issue_from_finding(repo, finding):
 
 ### References
 - [OWASP Top 10](https://owasp.org/Top10/)
-- [CWE Details: {cwe}](https://cwe.mitre.org/data/definitions/{cwe.split('-')[1] if '-' in cwe else '000'}.html)
+{references}
 - [Secure Coding Practices](https://owasp.org/www-project-secure-coding-practices-quick-reference-guide/)
 
 **Generated by**: GitHub Actions Security Analysis
 **Date**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}
 **Commit**: {os.environ.get('GITHUB_SHA', 'unknown')}
+
+{key_marker(group.key, group.digest())}
 """
 
     # Create appropriate labels
     labels = ['security', 'vulnerability', severity.lower()]
-    if 'injection' in rule_name.lower():
+    rule_names = ' '.join(rules).lower()
+    if 'injection' in rule_names:
         labels.append('injection')
-    if 'xss' in rule_name.lower():
+    if 'xss' in rule_names:
         labels.append('xss')
-    if 'crypto' in rule_name.lower():
+    if 'crypto' in rule_names:
         labels.append('cryptography')
-    if 'auth' in rule_name.lower():
+    if 'auth' in rule_names:
         labels.append('authentication')
 
-    try:
-        # Check if similar issue already exists
-        existing_issues = repo.get_issues(state='open', labels=['security'])
-
-        # Simple duplicate check based on file and rule
-        for issue in list(existing_issues)[:10]:  # Check last 10 security issues
-            if file_path in issue.body and rule_name in issue.body:
-                print(f"Similar issue already exists: {issue.html_url}")
-                return None
-
-        # Create the issue
-        issue = repo.create_issue(
-            title=title,
-            body=body,
-            labels=labels
-        )
-
-        print(f"Created security issue #{issue.number}: {title}")
-        return {
-            'number': issue.number,
-            'title': title,
-            'severity': severity,
-            'url': issue.html_url
-        }
+    return {
+        'severity': severity,
+        'title': title,
+        'body': body,
+        'labels': labels
+    }
 
-    except Exception as e:
-        print(f"Error creating issue for {rule_name}: {e}")
-        return None
+def sync_issues(client, repository, index, groups, workers=DEFAULT_WORKERS, max_locations=DEFAULT_MAX_LOCATIONS):
+    """Create an issue per new finding group and rewrite issues whose locations changed
 
-def process_custom_results(repo):
-    """Process custom security scan results"""
+    Groups are checked against ``index`` in order before anything is sent,
+    and results are collected in the same order, so the returned lists do
+    not depend on which request finishes first. Returns (created, updated).
+    """
     created_issues = []
-
-    if os.path.exists('custom-security-results.json'):
-        with open('custom-security-results.json', 'r') as f:
-            data = json.load(f)
-
-        findings = data.get('findings', [])
-        print(f"Processing {len(findings)} custom security findings...")
-
-        for finding in findings:
-            issue_info = create_issue_from_finding(repo, finding)
-            if issue_info:
+    updated_issues = []
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        jobs = []
+        for group in groups:
+            # Duplicate check against every open security issue, based on the group key
+            existing = index.find(group.key)
+            digest = group.digest()
+            if existing and existing.get('digest') == digest:
+                print(f"Issue already up to date: {existing['url']}")
+                continue
+
+            issue = issue_from_group(group, max_locations)
+            if existing:
+                # Labels are left alone, they may have been edited during triage
+                future = pool.submit(client.update_issue, repository, existing['number'], issue['title'], issue['body'])
+            else:
+                future = pool.submit(client.create_issue, repository, issue['title'], issue['body'], issue['labels'])
+            jobs.append((group, digest, issue, existing, future))
+
+        for group, digest, issue, existing, future in jobs:
+            try:
+                result = future.result()
+            except Exception as e:
+                action = 'updating' if existing else 'creating'
+                print(f"Error {action} issue for {', '.join(group.values)}: {e}")
+                continue
+
+            index.add(group.key, result['number'], issue['title'], result['html_url'], digest)
+            issue_info = {
+                'number': result['number'],
+                'title': issue['title'],
+                'severity': issue['severity'],
+                'locations': len(group),
+                'url': result['html_url']
+            }
+            if existing:
+                print(f"Updated security issue #{result['number']}: {issue['title']}")
+                updated_issues.append(issue_info)
+            else:
+                print(f"Created security issue #{result['number']}: {issue['title']}")
                 created_issues.append(issue_info)
 
-    return created_issues
-
-def process_semgrep_results(repo):
-    """Process Semgrep scan results"""
-    created_issues = []
-
-    if os.path.exists('semgrep-results.json'):
-        with open('semgrep-results.json', 'r') as f:
-            data = json.load(f)
-
-        results = data.get('results', [])
-        print(f"Processing {len(results)} Semgrep findings...")
-
-        for result in results:
-            finding = {
-                'file': result.get('path', ''),
-                'line': result.get('start', {}).get('line', 0),
-                'rule': result.get('check_id', 'semgrep-rule'),
-                'severity': result.get('extra', {}).get('severity', 'MEDIUM').upper(),
-                'description': result.get('extra', {}).get('message', 'Semgrep security finding'),
-                'match': result.get('extra', {}).get('lines', ''),
-                'cwe': 'CWE-000'  # Semgrep doesn't always provide CWE
-            }
+    return created_issues, updated_issues
 
-            issue_info = create_issue_from_finding(repo, finding)
-            if issue_info:
-                created_issues.append(issue_info)
+def load_findings():
+    """Stream the custom scanner's findings, then those of each enabled SAST tool"""
+    sast = security_config.SECURITY_TOOLS.get('sast', {})
+    for tool, (path, _, _) in TOOLS.items():
+        settings = sast.get(tool, {})
+        if not os.path.exists(path) or not settings.get('enabled', True):
+            continue
 
-    return created_issues
+        keep = bandit_filter(settings) if tool == 'bandit' else None
+        count = 0
+        for finding in iter_tool_findings(tool, path, keep):
+            count += 1
+            yield finding
+        print(f"Read {count} {tool} security findings from {path}")
 
 def create_security_summary(repo, all_issues):
     """Create a summary comment if this is a PR"""
@@ -230,39 +294,71 @@ The automated security analysis has completed and found {len(all_issues)} securi
         except Exception as e:
             print(f"Could not comment on PR: {e}")
 
+def load_issue_index(client, repository):
+    """Index of open security issues, revalidating the copy in SECURITY_ISSUE_INDEX if set"""
+    index_path = os.environ.get('SECURITY_ISSUE_INDEX')
+    index = IssueIndex.load(index_path, repository) if index_path else IssueIndex(repository)
+
+    fetched, revalidated = index.refresh(client)
+    print(f"Indexed {len(index)} open security issues "
+          f"({fetched} pages fetched, {revalidated} unchanged)")
+
+    if index_path:
+        try:
+            index.save(index_path)
+        except OSError as e:
+            print(f"Could not save issue index {index_path}: {e}")
+    return index
+
 def main():
     """Main execution function"""
     try:
         # Initialize GitHub connection
-        github = Github(os.environ['GITHUB_TOKEN'])
-        repo = github.get_repo(f"{os.environ['REPO_OWNER']}/{os.environ['REPO_NAME']}")
+        api_url = os.environ.get('GITHUB_API_URL', DEFAULT_API_URL)
+        repository = f"{os.environ['REPO_OWNER']}/{os.environ['REPO_NAME']}"
+        github = Github(os.environ['GITHUB_TOKEN'], base_url=api_url)
+        repo = github.get_repo(repository)
+
+        workers = int(os.environ.get('SECURITY_ISSUE_WORKERS', DEFAULT_WORKERS))
+        limiter = RateLimiter(float(os.environ.get('SECURITY_ISSUE_WRITE_INTERVAL', DEFAULT_WRITE_INTERVAL)))
+        client = GitHubClient(os.environ['GITHUB_TOKEN'], api_url, limiter, pool_size=max(workers, 1))
 
-        print("Creating GitHub issues for security findings...")
+        # One paginated pass over existing issues instead of one per finding
+        index = load_issue_index(client, repository)
 
-        # Process different types of security results
-        all_created_issues = []
+        # Aggregate every tool's findings so each distinct problem gets one issue
+        grouping = security_config.ISSUE_SETTINGS.get('grouping', {})
+        group_by = parse_group_by(os.environ.get('SECURITY_ISSUE_GROUP_BY') or grouping.get('group_by', DEFAULT_GROUP_BY))
+        max_locations = grouping.get('max_locations_per_issue', DEFAULT_MAX_LOCATIONS)
 
-        # Process custom security results
-        custom_issues = process_custom_results(repo)
-        all_created_issues.extend(custom_issues)
+        groups = group_findings(load_findings(), group_by)
+        print(f"Grouped {sum(len(group) for group in groups)} distinct findings by {'+'.join(group_by)} "
+              f"into {len(groups)} issues")
 
-        # Process Semgrep results
-        semgrep_issues = process_semgrep_results(repo)
-        all_created_issues.extend(semgrep_issues)
+        print(f"Syncing GitHub issues for security findings ({workers} at a time)...")
+        all_created_issues, all_updated_issues = sync_issues(
+            client, repository, index, groups, workers, max_locations)
+        client.close()
 
         # Create summary comment if there are issues
         create_security_summary(repo, all_created_issues)
 
-        if all_created_issues:
-            print(f"Successfully created {len(all_created_issues)} security issues")
+        if all_updated_issues:
+            print(f"Updated {len(all_updated_issues)} existing security issues")
+
+        if all_created_issues or all_updated_issues:
+            if all_created_issues:
+                print(f"Successfully created {len(all_created_issues)} security issues")
 
             # Write summary to file for other workflow steps
             with open('created-issues-summary.json', 'w') as f:
                 json.dump({
                     'total_created': len(all_created_issues),
-                    'issues': all_created_issues
+                    'issues': all_created_issues,
+                    'total_updated': len(all_updated_issues),
+                    'updated': all_updated_issues
                 }, f, indent=2)
-        else:
+        if not all_created_issues:
             print("No new security issues were created")
 
         return len(all_created_issues)
@@ -0,0 +1,60 @@
+"""
+Git Diff Scope
+Finds the files and lines changed between a merge base and HEAD using local git
+"""
+
+import re
+import subprocess
+
+HUNK_HEADER_RE = re.compile(r'^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@')
+
+
+def run_git(*args):
+    """Run a git command and return its stdout"""
+    result = subprocess.run(['git', *args], capture_output=True, text=True, encoding='utf-8', errors='replace')
+    if result.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def unquote_path(path):
+    """Undo git's C-style quoting of unusual paths in diff headers"""
+    if not (path.startswith('"') and path.endswith('"')):
+        return path
+    raw = path[1:-1].encode('utf-8').decode('unicode_escape')
+    return raw.encode('latin-1').decode('utf-8', errors='replace')
+
+
+def changed_lines(base, head='HEAD'):
+    """Map each file changed since the merge base of base and head to its added line numbers
+
+    Paths are relative to the current directory, the same way the scanner
+    walks, and only changes under it are included (git diff --relative), so
+    a scan run from a subdirectory stays inside it. Deleted files are left
+    out and a file that only lost lines maps to an empty set. Renames are not
+    detected, so a moved file counts as added in full wherever the scan runs;
+    otherwise it would only be new when its old path is outside the directory.
+    """
+    merge_base = run_git('merge-base', base, head).strip()
+    diff = run_git(
+        '-c', 'core.quotepath=off', 'diff', '--relative', '--unified=0', '--no-color', '--no-ext-diff',
+        '--no-renames', '--diff-filter=d', '--src-prefix=a/', '--dst-prefix=b/', merge_base, head
+    )
+
+    changes = {}
+    current = None
+    for line in diff.split('\n'):
+        if line.startswith('+++ '):
+            target = unquote_path(line[4:].rstrip('\t'))
+            current = target[2:] if target.startswith('b/') else None
+            if current is not None:
+                changes.setdefault(current, set())
+            continue
+
+        hunk = HUNK_HEADER_RE.match(line)
+        if hunk and current is not None:
+            start = int(hunk.group(1))
+            count = int(hunk.group(2)) if hunk.group(2) is not None else 1
+            changes[current].update(range(start, start + count))
+
+    return changes
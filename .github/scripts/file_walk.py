@@ -0,0 +1,140 @@
+"""
+File Walk
+Enumerates candidate files for the scanner with os.walk, os.scandir or the git index
+"""
+
+import os
+import subprocess
+from pathlib import Path
+
+WALKERS = ('scandir', 'walk', 'git')
+DEFAULT_WALKER = 'scandir'
+
+
+def suffix_matcher(extensions):
+    """Fast test for whether a file name ends with one of ``extensions``
+
+    Single-dot extensions are looked up in a set by the name's last suffix;
+    anything else falls back to str.endswith.
+    """
+    extensions = tuple(extensions)
+    if all(extension.count('.') == 1 and extension.startswith('.') for extension in extensions):
+        suffixes = frozenset(extensions)
+
+        def matches(name):
+            dot = name.rfind('.')
+            return dot != -1 and name[dot:] in suffixes
+        return matches
+    return lambda name: name.endswith(extensions)
+
+
+def _ignore_prefix(ignore_rules, root):
+    """Relative path prefix of ``root`` for the ignore matcher, or None to skip matching"""
+    if ignore_rules is None:
+        return None
+    relative_root = ignore_rules.relative(root)
+    if relative_root is None:
+        return None
+    return f'{relative_root}/' if relative_root else ''
+
+
+def walk_os(directory, extensions, exclude_directories, ignore_rules=None):
+    """Yield matching files via os.walk, in walk order"""
+    for root, dirs, files in os.walk(directory):
+        # Skip directories that shouldn't be scanned (including security-analysis)
+        dirs[:] = [d for d in dirs if d not in exclude_directories]
+
+        prefix = _ignore_prefix(ignore_rules, root)
+        if prefix is not None:
+            # Prune ignored directories here so their contents are never listed
+            dirs[:] = [d for d in dirs if not ignore_rules.match(prefix + d, is_dir=True)]
+            files = [file for file in files if not ignore_rules.match(prefix + file)]
+
+        for file in files:
+            if file.endswith(extensions):
+                yield Path(root) / file
+
+
+def walk_scandir(directory, extensions, exclude_directories, ignore_rules=None):
+    """Yield matching files via os.scandir, in the same order as walk_os
+
+    Entry types come from the directory listing (d_type), so no file is
+    stat-ed, and extensions are checked with one set lookup per name.
+    """
+    matches = suffix_matcher(extensions)
+    stack = [str(directory)]
+    while stack:
+        root = stack.pop()
+        try:
+            with os.scandir(root) as entries:
+                entries = list(entries)
+        except OSError:
+            continue
+
+        prefix = _ignore_prefix(ignore_rules, root)
+        subdirs = []
+        for entry in entries:
+            name = entry.name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+
+            if is_dir:
+                # Like os.walk, symlinked directories are not followed
+                if name in exclude_directories or entry.is_symlink():
+                    continue
+                if prefix is not None and ignore_rules.match(prefix + name, is_dir=True):
+                    continue
+                subdirs.append(os.path.join(root, name))
+            elif matches(name):
+                if prefix is not None and ignore_rules.match(prefix + name):
+                    continue
+                yield Path(root) / name
+
+        # os.walk visits subdirectories in listing order, depth first
+        stack.extend(reversed(subdirs))
+
+
+def git_ls_files(directory):
+    """Tracked files under ``directory`` from the git index, as paths below it
+
+    Returns None when ``directory`` is not inside a git work tree.
+    """
+    result = subprocess.run(['git', '-C', str(directory), 'ls-files', '-z'], capture_output=True)
+    if result.returncode != 0:
+        return None
+    return [os.fsdecode(path) for path in result.stdout.split(b'\0') if path]
+
+
+def walk_git(directory, extensions, exclude_directories, ignore_rules=None):
+    """Yield matching tracked files from ``git ls-files -z``, in index order
+
+    Files git ignores are never tracked, so .gitignore is honoured for free.
+    Falls back to walk_scandir outside a git work tree.
+    """
+    tracked = git_ls_files(directory)
+    if tracked is None:
+        print(f"{directory} is not in a git work tree, walking the file system instead")
+        yield from walk_scandir(directory, extensions, exclude_directories, ignore_rules)
+        return
+
+    matches = suffix_matcher(extensions)
+    ignored_dirs = {}
+    for relative in tracked:
+        parts = relative.split('/')
+        if not matches(parts[-1]) or not exclude_directories.isdisjoint(parts[:-1]):
+            continue
+
+        path = os.path.join(directory, *parts)
+        if ignore_rules is not None:
+            # Ancestor directories are checked once per directory, not per file
+            parent = os.path.dirname(path)
+            if parent not in ignored_dirs:
+                ignored_dirs[parent] = ignore_rules.is_ignored(parent, is_dir=True)
+            relative_path = ignore_rules.relative(path)
+            if ignored_dirs[parent] or (relative_path and ignore_rules.match(relative_path)):
+                continue
+        # Tracked files deleted from the work tree are still in the index
+        if os.path.isfile(path):
+            yield Path(path)
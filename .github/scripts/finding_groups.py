@@ -0,0 +1,113 @@
+"""
+Finding Groups
+Aggregates scan findings into one group per distinct problem before issues are created
+"""
+
+import hashlib
+import posixpath
+
+from findings import normalize_path
+
+# Fields findings can be grouped by, in the order they appear in a group's title
+GROUP_FIELDS = ('rule', 'cwe', 'severity', 'directory', 'file')
+DEFAULT_GROUP_BY = ('rule', 'file')
+
+# Most severe first
+SEVERITY_ORDER = ('CRITICAL', 'HIGH', 'MEDIUM', 'LOW')
+
+
+def finding_field(finding, field):
+    """Value of one grouping field for a finding"""
+    if field == 'rule':
+        return finding.get('rule', 'security-issue')
+    if field == 'cwe':
+        return finding.get('cwe', 'CWE-000')
+    if field == 'severity':
+        return finding.get('severity', 'MEDIUM').upper()
+    file_path = normalize_path(finding.get('file', 'unknown'))
+    if field == 'directory':
+        return posixpath.dirname(file_path) or '.'
+    return file_path
+
+
+def parse_group_by(value):
+    """Validated tuple of grouping fields from a list or a comma-separated string"""
+    if isinstance(value, str):
+        value = value.split(',')
+    fields = tuple(field.strip().lower() for field in value if field.strip())
+    unknown = [field for field in fields if field not in GROUP_FIELDS]
+    if unknown or not fields:
+        raise ValueError(f"Unknown grouping fields {unknown or fields}; choose from {', '.join(GROUP_FIELDS)}")
+    # 'file' already pins the directory
+    if 'file' in fields:
+        fields = tuple(field for field in fields if field != 'directory')
+    # Canonical order, so 'file,rule' and 'rule,file' give the same issue keys
+    return tuple(field for field in GROUP_FIELDS if field in fields)
+
+
+def group_key(values):
+    """Issue key for a group, from its grouping values in GROUP_FIELDS order
+
+    A (rule, file) group gets the same key as issue_index.issue_key, so
+    issues created one per finding are found and updated in place.
+    """
+    return hashlib.sha256('\0'.join(values).encode('utf-8')).hexdigest()
+
+
+def severity_rank(severity):
+    return SEVERITY_ORDER.index(severity) if severity in SEVERITY_ORDER else SEVERITY_ORDER.index('MEDIUM')
+
+
+class FindingGroup:
+    """Findings that share every grouping field, reported as one issue"""
+
+    def __init__(self, group_by, values):
+        self.group_by = group_by
+        self.values = values
+        self.fields = dict(zip(group_by, values))
+        self.key = group_key(values)
+        self.findings = []
+        self.seen = set()
+
+    def add(self, finding):
+        # The same hit reported twice (e.g. by two scanners) is one location
+        location = (finding_field(finding, 'file'), finding.get('line', 0), finding_field(finding, 'rule'))
+        if location not in self.seen:
+            self.seen.add(location)
+            self.findings.append(finding)
+
+    @property
+    def severity(self):
+        """Highest severity among the group's findings"""
+        return min((finding_field(finding, 'severity') for finding in self.findings), key=severity_rank)
+
+    def distinct(self, field):
+        """Sorted distinct values of a field across the group"""
+        return sorted({finding_field(finding, field) for finding in self.findings})
+
+    def locations(self):
+        """Findings in file, line and rule order, as shown in the issue's table"""
+        return sorted(self.findings, key=lambda finding: (
+            finding_field(finding, 'file'), finding.get('line', 0), finding_field(finding, 'rule')))
+
+    def digest(self):
+        """Hash of the location list; an issue is only rewritten when it changes"""
+        rows = '\n'.join(
+            f"{finding_field(finding, 'file')}:{finding.get('line', 0)}:{finding_field(finding, 'rule')}"
+            for finding in self.locations())
+        return hashlib.sha256(rows.encode('utf-8')).hexdigest()[:16]
+
+    def __len__(self):
+        return len(self.findings)
+
+
+def group_findings(findings, group_by=DEFAULT_GROUP_BY):
+    """Groups of findings sharing the ``group_by`` fields, in order of first appearance"""
+    groups = {}
+    for finding in findings:
+        values = tuple(finding_field(finding, field) for field in group_by)
+        group = groups.get(values)
+        if group is None:
+            group = groups[values] = FindingGroup(group_by, values)
+        group.add(finding)
+    return list(groups.values())
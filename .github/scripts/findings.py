@@ -0,0 +1,91 @@
+"""
+Compact Finding Records
+Slotted findings that reference interned files and rules instead of copying text
+"""
+
+from pathlib import PurePath
+
+# How a file was scanned, which decides how its findings are rendered back
+SOURCE_TEXT = 0          # decoded text, context is the surrounding lines
+SOURCE_TEXT_WINDOW = 1   # decoded text, restricted mode: context clipped to the match
+SOURCE_MAPPED = 2        # bytes over mmap, context is the surrounding lines
+SOURCE_MAPPED_WINDOW = 3 # bytes over mmap, restricted mode
+
+# Report fields every finding has, whichever tool produced it
+FINDING_FIELDS = ('file', 'line', 'rule', 'severity', 'cwe', 'match', 'context', 'description')
+MAX_MATCH_LENGTH = 100
+UNKNOWN_CWE = 'CWE-000'
+
+
+def normalize_path(file_path):
+    """Forward-slash relative path without a leading ./
+
+    Issue keys, group keys, fingerprints and exclusions all compare paths in
+    this form, so they must share this one definition.
+    """
+    return PurePath(file_path).as_posix().removeprefix('./')
+
+
+def report_finding(file_path, line, rule, severity, cwe, match, context, description):
+    """The finding dict written to reports, shared by the scanner and imported tool results"""
+    return {
+        'file': str(file_path),
+        'line': line,
+        'rule': rule,
+        'severity': severity,
+        'cwe': cwe or UNKNOWN_CWE,
+        'match': match[:MAX_MATCH_LENGTH],  # Truncate long matches
+        'context': context,
+        'description': description
+    }
+
+
+class Interner:
+    """Assigns small integer IDs to repeated values, such as file paths or rule names"""
+
+    def __init__(self):
+        self.values = []
+        self.ids = {}
+
+    def intern(self, key, value=None):
+        """ID for ``key``, storing ``value`` (default: the key) the first time it is seen"""
+        found = self.ids.get(key)
+        if found is None:
+            found = self.ids[key] = len(self.values)
+            self.values.append(key if value is None else value)
+        return found
+
+    def __getitem__(self, id):
+        return self.values[id]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class Finding:
+    """One rule match, reduced to IDs and offsets
+
+    Match text and context are not stored; they are rendered from the source
+    file when a report needs them. ``start`` and ``length`` are offsets into
+    the decoded text, or into the raw bytes for memory-mapped files.
+    ``occurrence`` numbers matches of the same rule on the same line text,
+    counted over the whole file before any filtering, for the fingerprint.
+    """
+
+    __slots__ = ('file_id', 'rule_id', 'line', 'start', 'length', 'occurrence')
+
+    def __init__(self, file_id, rule_id, line, start, length, occurrence=1):
+        self.file_id = file_id
+        self.rule_id = rule_id
+        self.line = line
+        self.start = start
+        self.length = length
+        self.occurrence = occurrence
+
+    @property
+    def end(self):
+        return self.start + self.length
+
+    def __repr__(self):
+        return (f"Finding(file_id={self.file_id}, rule_id={self.rule_id}, line={self.line}, "
+                f"start={self.start}, length={self.length}, occurrence={self.occurrence})")
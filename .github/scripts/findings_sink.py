@@ -0,0 +1,77 @@
+"""
+Streaming Findings Sink
+Writes scanner findings as they are produced and assembles the final report from the stream
+"""
+
+import json
+
+SEVERITY_KEYS = ('critical', 'high', 'medium', 'low')
+
+
+def new_summary():
+    """Zeroed summary counters in report order"""
+    return {'total': 0, **{key: 0 for key in SEVERITY_KEYS}}
+
+
+class JsonLinesSink:
+    """Appends each finding to a JSON Lines file, one object per line
+
+    The file is truncated when the sink opens and flushed after every batch,
+    so other tools can follow it while the scan is still running.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def write(self, findings):
+        """Append a batch of findings, normally everything found in one file"""
+        for finding in findings:
+            self.file.write(json.dumps(finding))
+            self.file.write('\n')
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+    def __iter__(self):
+        """Read findings back in the order they were written"""
+        self.close()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _indent_json(value, level):
+    """json.dumps(value, indent=2) as if nested ``level`` deep in a larger document"""
+    return json.dumps(value, indent=2).replace('\n', '\n' + '  ' * level)
+
+
+def encode_finding(finding):
+    """One finding as it appears in a report's findings array"""
+    return _indent_json(finding, 2)
+
+
+def write_report(f, findings, summary, scan_info):
+    """Stream a report to f, byte-identical to json.dump(report, f, indent=2)
+
+    ``findings`` may be any iterable, so only one finding at a time has to be
+    held in memory.
+    """
+    write_encoded_report(f, map(encode_finding, findings), summary, scan_info)
+
+
+def write_encoded_report(f, encoded_findings, summary, scan_info):
+    """write_report for findings already passed through encode_finding"""
+    f.write('{\n  "findings": [')
+    first = True
+    for encoded in encoded_findings:
+        f.write('\n    ' if first else ',\n    ')
+        f.write(encoded)
+        first = False
+    f.write(']' if first else '\n  ]')
+    f.write(',\n  "summary": ' + _indent_json(summary, 1))
+    f.write(',\n  "scan_info": ' + _indent_json(scan_info, 1))
+    f.write('\n}')
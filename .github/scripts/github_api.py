@@ -0,0 +1,139 @@
+"""
+GitHub API Client
+Thread-safe REST calls that pace writes and back off on primary and secondary rate limits
+"""
+
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_API_URL = 'https://api.github.com'
+
+# GitHub allows about 80 content-creating requests a minute before secondary limits kick in
+DEFAULT_WRITE_INTERVAL = 0.75
+
+# Secondary limits without a Retry-After: wait at least a minute, doubling each retry
+DEFAULT_BACKOFF = 60.0
+MAX_RETRIES = 5
+
+WRITE_METHODS = frozenset(['POST', 'PATCH', 'PUT', 'DELETE'])
+
+# Schemes that get the pooled adapter and mark a path as an absolute URL
+# (GitHub Enterprise Server may be served over plain HTTP)
+URL_SCHEMES = ('https', 'http')
+
+
+class RateLimiter:
+    """Shared pause and write pacing for every thread using one token
+
+    A rate-limit response pauses all threads, not just the one that saw it,
+    since they draw on the same quota.
+    """
+
+    def __init__(self, write_interval=DEFAULT_WRITE_INTERVAL, backoff=DEFAULT_BACKOFF):
+        self.write_interval = write_interval
+        self.backoff = backoff
+        self.lock = threading.Lock()
+        self.resume_at = 0.0
+        self.next_write = 0.0
+
+    def wait(self, write=False):
+        """Block until a request may be sent, claiming a write slot if ``write``"""
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.resume_at)
+            if write:
+                start = max(start, self.next_write)
+                self.next_write = start + self.write_interval
+        delay = start - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        """Hold every thread for ``seconds`` from now"""
+        with self.lock:
+            self.resume_at = max(self.resume_at, time.monotonic() + seconds)
+
+    def update(self, response, attempt=0):
+        """Apply a response's rate-limit headers; return True if it should be retried"""
+        headers = response.headers
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+        primary_exhausted = remaining == '0' and reset is not None
+
+        if primary_exhausted:
+            # Primary limit: nothing more is allowed until the reset time (epoch seconds)
+            self.pause(max(float(reset) - time.time(), 0.0) + 1.0)
+
+        if response.status_code not in (403, 429):
+            return False
+
+        retry_after = headers.get('Retry-After')
+        if retry_after is not None:
+            self.pause(float(retry_after))
+            return True
+        if primary_exhausted:
+            return True
+        if response.status_code == 429 or 'rate limit' in response.text.lower():
+            self.pause(self.backoff * 2 ** attempt)
+            return True
+        # A plain 403 is a permission problem, not a limit
+        return False
+
+
+class GitHubClient:
+    """requests session bound to one token, safe to share between worker threads"""
+
+    def __init__(self, token, api_url=DEFAULT_API_URL, limiter=None, pool_size=10):
+        self.api_url = api_url.rstrip('/')
+        self.limiter = limiter or RateLimiter()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        for scheme in URL_SCHEMES:
+            self.session.mount(f'{scheme}://', adapter)
+        self.session.headers.update({
+            'Authorization': f"Bearer {token}",
+            'Accept': 'application/vnd.github+json'
+        })
+
+    def close(self):
+        self.session.close()
+
+    def url(self, path):
+        return path if urlsplit(path).scheme in URL_SCHEMES else f"{self.api_url}/{path.lstrip('/')}"
+
+    def request(self, method, path, **kwargs):
+        """Send a request, waiting out rate limits; returns the final response"""
+        method = method.upper()
+        url = self.url(path)
+        for attempt in range(MAX_RETRIES + 1):
+            self.limiter.wait(write=method in WRITE_METHODS)
+            response = self.session.request(method, url, **kwargs)
+            if not self.limiter.update(response, attempt) or attempt == MAX_RETRIES:
+                return response
+            print(f"GitHub rate limit hit on {method} {url}, retrying ({attempt + 1}/{MAX_RETRIES})")
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def patch(self, path, **kwargs):
+        return self.request('PATCH', path, **kwargs)
+
+    def create_issue(self, repository, title, body, labels):
+        """Create an issue and return its JSON, raising on failure"""
+        response = self.post(f'repos/{repository}/issues',
+                             json={'title': title, 'body': body, 'labels': labels})
+        response.raise_for_status()
+        return response.json()
+
+    def update_issue(self, repository, number, title, body):
+        """Rewrite an issue's title and body and return its JSON, raising on failure"""
+        response = self.patch(f'repos/{repository}/issues/{number}', json={'title': title, 'body': body})
+        response.raise_for_status()
+        return response.json()
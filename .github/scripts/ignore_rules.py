@@ -0,0 +1,147 @@
+"""
+Ignore Rules
+Compiles .securityignore / .gitignore patterns into a single gitignore-style path matcher
+"""
+
+import os
+import re
+from pathlib import PurePath
+
+DEFAULT_IGNORE_FILE = '.securityignore'
+
+
+def parse_ignore_lines(lines):
+    """Yield (pattern, negated) for each rule line, following gitignore syntax"""
+    for line in lines:
+        line = line.rstrip('\n').rstrip('\r')
+        # Trailing spaces are dropped unless escaped with a backslash
+        stripped = line.rstrip(' ')
+        if stripped.endswith('\\') and len(stripped) < len(line):
+            stripped += ' '
+        line = stripped
+        if not line or line.startswith('#'):
+            continue
+
+        negated = line.startswith('!')
+        if negated:
+            line = line[1:]
+        elif line.startswith('\\#') or line.startswith('\\!'):
+            line = line[1:]
+        if line:
+            yield line, negated
+
+
+def translate_pattern(pattern):
+    """Regex for one gitignore pattern, matched against a relative path
+
+    Directories are tested with a trailing slash, so a pattern ending in ``/``
+    only matches directories while other patterns match both.
+    """
+    directory_only = pattern.endswith('/')
+    pattern = pattern.rstrip('/')
+    # A slash anywhere but the end anchors the pattern to the ignore file's directory
+    anchored = '/' in pattern
+    pattern = pattern.lstrip('/')
+
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i) and (i == 0 or pattern[i - 1] == '/'):
+            parts.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('/**', i) and i + 3 == len(pattern):
+            parts.append('/.+')
+            i += 3
+        elif pattern[i] == '*':
+            while i < len(pattern) and pattern[i] == '*':
+                i += 1
+            parts.append('[^/]*')
+        elif pattern[i] == '?':
+            parts.append('[^/]')
+            i += 1
+        elif pattern[i] == '[':
+            end = pattern.find(']', i + 2)
+            if end == -1:
+                parts.append(re.escape('['))
+                i += 1
+                continue
+            body = pattern[i + 1:end]
+            if body.startswith('!'):
+                body = '^' + body[1:]
+            parts.append('[' + body.replace('\\', '\\\\') + ']')
+            i = end + 1
+        elif pattern[i] == '\\' and i + 1 < len(pattern):
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+
+    body = ''.join(parts)
+    prefix = '' if anchored else '(?:.*/)?'
+    suffix = '/' if directory_only else '/?'
+    return f'{prefix}{body}{suffix}\\Z'
+
+
+class IgnoreMatcher:
+    """All rules from one or more ignore files, compiled into a single regex
+
+    Rules are joined in reverse order so the first alternative that matches is
+    the last rule in the file, which is the one gitignore says decides.
+    """
+
+    def __init__(self, rules, base='.'):
+        self.base = os.path.abspath(base)
+        self.rules = list(rules)
+        self.negated = [negated for _, negated in self.rules]
+        alternatives = [
+            f'(?P<r{index}>{translate_pattern(pattern)})'
+            for index, (pattern, _) in reversed(list(enumerate(self.rules)))
+        ]
+        self.regex = re.compile('|'.join(alternatives) if alternatives else r'(?!)')
+
+    @classmethod
+    def from_files(cls, paths, base='.'):
+        """Matcher for the rules in every existing file of ``paths``, in order"""
+        rules = []
+        for path in paths:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    rules.extend(parse_ignore_lines(f))
+            except OSError:
+                continue
+        return cls(rules, base)
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def relative(self, path):
+        """Forward-slash path relative to the matcher's base, or None if outside it"""
+        relative = os.path.relpath(os.path.abspath(path), self.base)
+        if relative == '.':
+            return ''
+        if relative == '..' or relative.startswith('..' + os.sep):
+            return None
+        return PurePath(relative).as_posix()
+
+    def match(self, relative_path, is_dir=False):
+        """Whether the last rule matching this relative path ignores it"""
+        found = self.regex.match(relative_path + '/' if is_dir else relative_path)
+        if found is None:
+            return False
+        return not self.negated[int(found.lastgroup[1:])]
+
+    def is_ignored(self, path, is_dir=False):
+        """Whether a path, or any directory above it, is ignored
+
+        A file inside an ignored directory stays ignored even if a later
+        negated rule matches it, as in git.
+        """
+        relative = self.relative(path)
+        if not relative:
+            return False
+        parts = relative.split('/')
+        for depth in range(1, len(parts)):
+            if self.match('/'.join(parts[:depth]), is_dir=True):
+                return True
+        return self.match(relative, is_dir)
@@ -0,0 +1,164 @@
+"""
+Issue Index
+One paginated fetch of the open security issues, keyed by finding group for duplicate checks
+"""
+
+import hashlib
+import json
+import os
+import re
+
+from findings import normalize_path
+
+# Bump when the cache layout or the key recipe changes
+INDEX_FORMAT_VERSION = 2
+
+ISSUE_LABEL = 'security'
+PAGE_SIZE = 100
+
+# Hidden marker written into every issue body so the key survives title and body edits;
+# it also carries a digest of the issue's location table
+KEY_MARKER = 'security-finding-key'
+KEY_MARKER_RE = re.compile(rf'<!-- {KEY_MARKER}: ([0-9a-f]{{64}})(?: locations: ([0-9a-f]+))? -->')
+
+# Issues created before the marker existed are keyed from their body instead
+COMPONENT_RE = re.compile(r'\*\*Component\*\*: `([^`\n]*)`')
+RULE_RE = re.compile(r'\*\*Detection Rule\*\*: ([^\s]+)')
+NEXT_LINK_RE = re.compile(r'<([^>]+)>;\s*rel="next"')
+
+
+def issue_key(file_path, rule_name):
+    """Key of a single rule-in-one-file issue, as created before findings were grouped"""
+    return hashlib.sha256(f'{rule_name}\0{normalize_path(file_path)}'.encode('utf-8')).hexdigest()
+
+
+def key_marker(key, digest):
+    """HTML comment carrying the issue key and location digest, invisible in the rendered issue"""
+    return f'<!-- {KEY_MARKER}: {key} locations: {digest} -->'
+
+
+def key_from_body(body):
+    """(key, digest) from a body's marker, or a key from its Component and Detection Rule lines"""
+    body = body or ''
+    marker = KEY_MARKER_RE.search(body)
+    if marker:
+        return marker.group(1), marker.group(2)
+    component = COMPONENT_RE.search(body)
+    rule = RULE_RE.search(body)
+    if component and rule:
+        return issue_key(component.group(1), rule.group(1)), None
+    return None, None
+
+
+def compact_issue(item):
+    """The fields of an issue the index keeps, from one REST API list item"""
+    key, digest = key_from_body(item.get('body'))
+    return {
+        'number': item['number'],
+        'title': item.get('title', ''),
+        'url': item.get('html_url', ''),
+        'key': key,
+        'digest': digest
+    }
+
+
+class IssueIndex:
+    """Open security issues of one repository, looked up by issue key
+
+    ``pages`` mirrors the paginated list response, each page with the ETag it
+    was served with. When the index is loaded from disk every page is
+    revalidated with If-None-Match, and a 304 reuses the stored page; GitHub
+    does not charge 304 responses against the rate limit.
+    """
+
+    def __init__(self, repository, pages=None):
+        self.repository = repository
+        self.pages = pages or []
+        self.issues = {}
+        self._index_pages()
+
+    def _index_pages(self):
+        self.issues = {}
+        # Pages are newest first, so the oldest issue for a key wins, as it is the one people track
+        for page in reversed(self.pages):
+            for issue in reversed(page['issues']):
+                if issue['key']:
+                    self.issues.setdefault(issue['key'], issue)
+
+    @classmethod
+    def load(cls, path, repository):
+        """Index stored by ``save``, or an empty one if the file is missing or stale"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(repository)
+        if data.get('version') != INDEX_FORMAT_VERSION or data.get('repository') != repository:
+            return cls(repository)
+        return cls(repository, data.get('pages', []))
+
+    def save(self, path):
+        """Store the fetched pages and their ETags for the next run"""
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': INDEX_FORMAT_VERSION,
+                'repository': self.repository,
+                'pages': self.pages
+            }, f)
+        os.replace(tmp_path, path)
+
+    def refresh(self, client):
+        """Fetch every page of open security issues through a GitHubClient, revalidating stored pages
+
+        Returns (fetched, revalidated): pages downloaded and pages answered
+        with 304 Not Modified.
+        """
+        url = f'repos/{self.repository}/issues'
+        params = {'state': 'open', 'labels': ISSUE_LABEL, 'per_page': PAGE_SIZE}
+        stored = self.pages
+        pages = []
+        fetched = revalidated = 0
+
+        while url:
+            cached = stored[len(pages)] if len(pages) < len(stored) else None
+            headers = {}
+            if cached and cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+
+            response = client.get(url, params=params, headers=headers)
+            if response.status_code == 304:
+                page = cached
+                revalidated += 1
+            else:
+                response.raise_for_status()
+                next_link = NEXT_LINK_RE.search(response.headers.get('Link', ''))
+                page = {
+                    'etag': response.headers.get('ETag'),
+                    'next': next_link.group(1) if next_link else None,
+                    # The issues endpoint also lists pull requests
+                    'issues': [compact_issue(item) for item in response.json() if 'pull_request' not in item]
+                }
+                fetched += 1
+
+            pages.append(page)
+            url = page['next']
+            # The next link already carries the query string
+            params = None
+
+        self.pages = pages
+        self._index_pages()
+        return fetched, revalidated
+
+    def find(self, key):
+        """Open issue already covering this finding group, or None"""
+        return self.issues.get(key)
+
+    def add(self, key, number, title, url, digest=None):
+        """Record an issue created or rewritten during this run"""
+        issue = {'number': number, 'title': title, 'url': url, 'key': key, 'digest': digest}
+        self.issues[key] = issue
+        return issue
+
+    def __len__(self):
+        return len(self.issues)
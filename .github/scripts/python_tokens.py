@@ -0,0 +1,146 @@
+"""
+Python Tokens
+Lexes a Python source once so rules can skip comments and docstrings
+and be limited to string literals or names
+"""
+
+import re
+from bisect import bisect_left
+
+# Token classes a rule can be limited to in security_config.PYTHON_TOKEN_SCOPES
+TOKEN_CLASSES = ('string', 'name')
+
+# Only the tokens the rules care about: comments and string literals, plus
+# brackets so strings inside an expression are not taken for docstrings.
+# Each match first skips the text in between (names, numbers, operators).
+PYTHON_TOKEN_PATTERN = (
+    r'''[^#'"()\[\]{}]*(?:'''
+    r'''(?P<comment>#[^\n]*)'''
+    r'''|(?P<string>\'\'\'[^'\\]*(?:(?:\\.|'(?!''))[^'\\]*)*\'\'\''''
+    r'''|"""[^"\\]*(?:(?:\\.|"(?!""))[^"\\]*)*"""'''
+    r'''|'[^'\\\n]*(?:\\.[^'\\\n]*)*\''''
+    r'''|"[^"\\\n]*(?:\\.[^"\\\n]*)*")'''
+    r'''|(?P<open>[(\[{])'''
+    r'''|(?P<close>[)\]}]))'''
+)
+# The pattern is ASCII, so the bytes version lexes UTF-8 memory-mapped files
+PYTHON_TOKEN_RE = re.compile(PYTHON_TOKEN_PATTERN, re.DOTALL)
+PYTHON_TOKEN_BYTES_RE = re.compile(PYTHON_TOKEN_PATTERN.encode('ascii'), re.DOTALL)
+
+STRING_PREFIX_CHARS = frozenset('rRbBuUfF')
+STRING_PREFIX_BYTES = frozenset(char.encode('ascii') for char in STRING_PREFIX_CHARS)
+NOT_NEWLINE_RE = re.compile(r'[^\n]+')
+NOT_NEWLINE_BYTES_RE = re.compile(rb'[^\n]+')
+
+
+def blank(text):
+    """Spaces in place of everything but newlines, so offsets and line numbers are kept"""
+    if isinstance(text, str):
+        return NOT_NEWLINE_RE.sub(lambda run: ' ' * len(run.group()), text)
+    return NOT_NEWLINE_BYTES_RE.sub(lambda run: b' ' * len(run.group()), text)
+
+
+def is_name_char(char):
+    """Whether a one-character str or bytes slice can be part of an identifier"""
+    if isinstance(char, str):
+        return char.isalnum() or char == '_'
+    # Bytes of a UTF-8 encoded non-ASCII character are identifier characters too
+    return char.isalnum() or char == b'_' or char >= b'\x80'
+
+
+class PythonSource:
+    """One .py file lexed once, reduced to what the rules need
+
+    Works on decoded text or on the bytes of a memory-mapped file, with
+    offsets of the same kind. Views of the file blank out comments and
+    statement-level strings (docstrings), and optionally every string
+    literal. They keep the file's length and newlines, so offsets matched
+    in a view point at the same text in the file.
+    """
+
+    def __init__(self, content):
+        self.content = content
+        self.binary = not isinstance(content, str)
+        self.string_starts = []
+        self.string_ends = []
+        # Comments and docstrings
+        self.blanked = []
+
+        regex = PYTHON_TOKEN_BYTES_RE if self.binary else PYTHON_TOKEN_RE
+        prefix_chars = STRING_PREFIX_BYTES if self.binary else STRING_PREFIX_CHARS
+        depth = 0
+        for token in regex.finditer(content):
+            kind = token.lastgroup
+            start, end = token.span(kind)
+            if kind == 'string':
+                # Take in a prefix such as r or rb, unless it ends a name
+                prefix_start = start
+                while prefix_start > max(start - 2, 0) and content[prefix_start - 1:prefix_start] in prefix_chars:
+                    prefix_start -= 1
+                if prefix_start and is_name_char(content[prefix_start - 1:prefix_start]):
+                    prefix_start = start
+                self.string_starts.append(prefix_start)
+                self.string_ends.append(end)
+                if depth == 0 and self._is_statement(prefix_start, end):
+                    self.blanked.append((prefix_start, end))
+            elif kind == 'comment':
+                self.blanked.append((start, end))
+            elif kind == 'open':
+                depth += 1
+            else:
+                depth = max(depth - 1, 0)
+
+    def _is_statement(self, start, end):
+        """Whether a string outside brackets is a statement of its own, as docstrings are"""
+        content = self.content
+        newline, backslash, hash_mark = (b'\n', b'\\', b'#') if self.binary else ('\n', '\\', '#')
+        line_start = content.rfind(newline, 0, start) + 1
+        if content[line_start:start].strip():
+            return False
+        # Not when the previous line continues into this one with a backslash
+        previous = content[max(line_start - 3, 0):line_start].rstrip(b'\r\n' if self.binary else '\r\n')
+        if previous.endswith(backslash):
+            return False
+        line_end = content.find(newline, end)
+        rest = content[end:line_end if line_end != -1 else len(content)].strip()
+        return not rest or rest.startswith(hash_mark)
+
+    def _spans(self, strings):
+        if not strings:
+            return self.blanked
+        # Docstrings are string literals too; comments never overlap them
+        return sorted(set(self.blanked).union(zip(self.string_starts, self.string_ends)))
+
+    def text_view(self, strings=False):
+        """The decoded source without comments and docstrings, and without any string literal if ``strings``"""
+        content = self.content
+        pieces = []
+        position = 0
+        for start, end in self._spans(strings):
+            pieces.append(content[position:start])
+            pieces.append(blank(content[start:end]))
+            position = end
+        pieces.append(content[position:])
+        return ''.join(pieces)
+
+    def blank_into(self, buffer, strings=False):
+        """Blank the same spans in a writable copy of a mapped file, such as an ACCESS_COPY mmap"""
+        for start, end in self._spans(strings):
+            buffer[start:end] = blank(buffer[start:end])
+
+    def in_string(self, start, end):
+        """Whether [start, end) overlaps a string literal"""
+        index = bisect_left(self.string_starts, end) - 1
+        return index >= 0 and self.string_ends[index] > start
+
+    def starts_name(self, start):
+        """Whether offset ``start`` begins an identifier outside any string literal"""
+        if start and is_name_char(self.content[start - 1:start]):
+            return False
+        return not self.in_string(start, start + 1)
+
+    def in_scope(self, token_class, start, end):
+        """Whether a match belongs to a token class: touching a string, or starting a name"""
+        if token_class == 'string':
+            return self.in_string(start, end)
+        return self.starts_name(start)
@@ -0,0 +1,140 @@
+"""
+SARIF Writer
+Streams security scanner findings as a SARIF 2.1.0 log with stable fingerprints
+"""
+
+import hashlib
+import json
+import re
+from urllib.parse import quote
+
+from findings import normalize_path
+
+SARIF_VERSION = '2.1.0'
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+
+TOOL_NAME = 'custom-security-scanner'
+
+# Key under partialFingerprints; bump the suffix if the fingerprint recipe changes
+FINGERPRINT_NAME = 'securityScanner/v2'
+
+SARIF_LEVELS = {
+    'CRITICAL': 'error',
+    'HIGH': 'error',
+    'MEDIUM': 'warning',
+    'LOW': 'note'
+}
+
+# Numeric score GitHub code scanning uses to rank security alerts
+SECURITY_SEVERITY = {
+    'CRITICAL': '9.5',
+    'HIGH': '8.0',
+    'MEDIUM': '5.5',
+    'LOW': '3.0'
+}
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_match(match_text):
+    """Collapse whitespace so reformatting a line does not change its fingerprint"""
+    return WHITESPACE_RE.sub(' ', match_text).strip()
+
+
+def finding_fingerprint(rule_name, path, line_text, occurrence=1):
+    """Stable hash of rule, file and the normalized matched line, plus an occurrence number
+
+    Line numbers are left out on purpose, so a finding keeps its fingerprint
+    when unrelated edits move it up or down the file. Hashing the line rather
+    than the match keeps rules with a fixed match, such as ``http://``, from
+    reducing to "the nth hit in the file". ``occurrence`` only tells apart
+    matches of one rule on identical lines. The scanner counts them in file
+    order before any finding is filtered out, so every mode numbers alike.
+    ``path`` is the file as normalize_path returns it, which callers compute
+    once per file rather than per finding.
+    """
+    key = '\0'.join([rule_name, path, normalize_match(line_text)])
+    return f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}:{occurrence}"
+
+
+def sarif_rule(rule_name, rule_config):
+    """reportingDescriptor for one scanner pattern"""
+    severity = rule_config['severity']
+    return {
+        'id': rule_name,
+        'name': ''.join(part.capitalize() for part in rule_name.split('_')),
+        'shortDescription': {'text': rule_config['description']},
+        'fullDescription': {'text': f"{rule_config['description']} ({rule_config['cwe']})"},
+        'defaultConfiguration': {'level': SARIF_LEVELS.get(severity, 'warning')},
+        'properties': {
+            'tags': ['security', rule_config['cwe']],
+            'problem.severity': SARIF_LEVELS.get(severity, 'warning'),
+            'security-severity': SECURITY_SEVERITY.get(severity, '5.5'),
+            'precision': 'medium'
+        }
+    }
+
+
+def sarif_result(finding, rule_index):
+    """SARIF result for one scanner finding, fingerprinted by the scanner"""
+    return {
+        'ruleId': finding['rule'],
+        'ruleIndex': rule_index,
+        'level': SARIF_LEVELS.get(finding['severity'], 'warning'),
+        'message': {'text': f"{finding['description']}: {finding['match']}"},
+        'locations': [{
+            'physicalLocation': {
+                'artifactLocation': {
+                    'uri': quote(normalize_path(finding['file'])),
+                    'uriBaseId': '%SRCROOT%'
+                },
+                'region': {
+                    'startLine': finding['line'],
+                    'snippet': {'text': finding['match']}
+                }
+            }
+        }],
+        'partialFingerprints': {FINGERPRINT_NAME: finding['fingerprint']},
+        'properties': {'severity': finding['severity'], 'cwe': finding['cwe']}
+    }
+
+
+def write_sarif(f, patterns, findings, diagnostics=()):
+    """Stream a SARIF log for findings to f, writing one result at a time
+
+    ``patterns`` is the scanner's rule dictionary and becomes the driver's rule
+    list; rule timeouts and other diagnostics become tool notifications.
+    """
+    rule_names = list(patterns)
+    rule_index = {name: index for index, name in enumerate(rule_names)}
+    driver = {
+        'name': TOOL_NAME,
+        'informationUri': 'https://github.com/johnmillerATcodemag-com/AI-Assisted-Brownfield-Development',
+        'rules': [sarif_rule(name, patterns[name]) for name in rule_names]
+    }
+    invocation = {
+        'executionSuccessful': True,
+        'toolExecutionNotifications': [
+            {
+                'level': 'warning',
+                'message': {'text': f"{diagnostic['rule']}: {diagnostic['message']}"},
+                'locations': [{
+                    'physicalLocation': {
+                        'artifactLocation': {'uri': quote(normalize_path(diagnostic['file'])), 'uriBaseId': '%SRCROOT%'}
+                    }
+                }]
+            }
+            for diagnostic in diagnostics
+        ]
+    }
+
+    f.write('{"$schema": ' + json.dumps(SARIF_SCHEMA) + ', "version": ' + json.dumps(SARIF_VERSION) + ', "runs": [{')
+    f.write('\n"tool": ' + json.dumps({'driver': driver}))
+    f.write(',\n"invocations": ' + json.dumps([invocation]))
+    f.write(',\n"results": [')
+    first = True
+    for finding in findings:
+        f.write('\n' if first else ',\n')
+        f.write(json.dumps(sarif_result(finding, rule_index.get(finding['rule'], -1))))
+        first = False
+    f.write('\n]}]}\n')
@@ -0,0 +1,101 @@
+"""
+Incremental Scan Cache
+Persists per-file scan records between security scanner runs
+"""
+
+import hashlib
+import json
+import os
+
+# Bump when the cache layout or the shape of cached scan records changes
+CACHE_FORMAT_VERSION = 4
+
+DEFAULT_CACHE_PATH = '.security-scan-cache.json'
+
+
+def file_digest(file_path):
+    """SHA-256 of a file's raw bytes"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ScanCache:
+    """On-disk map of file path to scan record, valid for a single rule-set fingerprint
+
+    An entry is reused when the file's size and mtime are unchanged, or when
+    they changed but the content hash did not. Loading a cache written for a
+    different fingerprint starts from empty, so editing any rule invalidates
+    every entry at once.
+    """
+
+    def __init__(self, path, fingerprint):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.entries = {}
+        self.fresh = {}
+        self.pending = {}
+        self.hits = 0
+        self.misses = 0
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if data.get('version') == CACHE_FORMAT_VERSION and data.get('fingerprint') == fingerprint:
+            self.entries = data.get('files', {})
+        else:
+            print(f"Scan cache {path} was built for a different rule set, starting fresh")
+
+    def lookup(self, file_path):
+        """Return the cached scan record for a file, or None if it must be rescanned"""
+        key = str(file_path)
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+
+        entry = self.entries.get(key)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return self._hit(key, entry)
+
+        try:
+            digest = file_digest(file_path)
+        except OSError:
+            return None
+
+        if entry and entry['sha256'] == digest:
+            entry['size'] = stat.st_size
+            entry['mtime_ns'] = stat.st_mtime_ns
+            return self._hit(key, entry)
+
+        self.misses += 1
+        self.pending[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest}
+        return None
+
+    def _hit(self, key, entry):
+        self.hits += 1
+        self.fresh[key] = entry
+        return entry['record']
+
+    def store(self, file_path, record):
+        """Record the scan result of a file that lookup() reported as stale"""
+        entry = self.pending.pop(str(file_path), None)
+        if entry is not None:
+            entry['record'] = record
+            self.fresh[str(file_path)] = entry
+
+    def save(self):
+        """Write entries seen during this run, dropping files that disappeared"""
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': CACHE_FORMAT_VERSION,
+                'fingerprint': self.fingerprint,
+                'files': self.fresh
+            }, f)
+        os.replace(temp_path, self.path)
@@ -35,6 +35,8 @@ EXCLUDE_DIRECTORIES = [
 EXCLUDE_FILES = [
     "test_vulnerable_code.py",  # Security testing file with fake credentials
     "security_test_samples.py",
+    "test_security_analyzer.py",
+    ".github/scripts/security_scanner.py",  # Rule definitions, whose regex strings match themselves
     "**/test_*_vulnerable_*.py",
     "**/demo_*_insecure_*.py"
 ]
@@ -177,6 +179,12 @@ ISSUE_SETTINGS = {
         "high": "Next Sprint",
         "medium": "Backlog",
         "low": "Future"
+    },
+    "grouping": {
+        # One issue per distinct combination of these fields:
+        # rule, cwe, severity, directory, file (override with SECURITY_ISSUE_GROUP_BY)
+        "group_by": ["rule", "file"],
+        "max_locations_per_issue": 100
     }
 }
 
@@ -198,6 +206,22 @@ CUSTOM_PATTERNS = {
         "pattern": r"(?i)(pickle\.loads|yaml\.load|eval\(|exec\()",
         "severity": "CRITICAL",
         "cwe": "CWE-502",
-        "description": "Unsafe deserialization or code execution"
+        "description": "Unsafe deserialization or code execution",
+        # Optional: only scan files of these languages (see BUILTIN_LANGUAGES
+        # in security_scanner.py) or extensions such as ".vue"
+        "languages": ["python", "ruby", "javascript", "typescript", "php", "java"]
     }
 }
+
+# Python sources are tokenized before scanning: comments and docstrings are
+# never matched, and the rules listed here only match one token class.
+# "string": the match must touch a string literal (secrets, URLs)
+# "name": the match must start at a name, e.g. the function being called;
+# these rules run over a view with every string literal blanked as well
+PYTHON_TOKEN_SCOPES = {
+    "hardcoded_secrets": "string",
+    "insecure_http": "string",
+    "api_key_exposure": "string",
+    "weak_crypto": "name",
+    "unsafe_deserialization": "name"
+}
@@ -4,183 +4,1705 @@ Security Analysis Script
 Performs custom security pattern analysis on code files
 """
 
+import argparse
+import bisect
+import contextlib
+import hashlib
 import json
+import mmap
 import os
 import re
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+import security_config
+from diff_scope import changed_lines
+from file_walk import DEFAULT_WALKER, WALKERS, walk_git, walk_os, walk_scandir
+from findings import (SOURCE_MAPPED, SOURCE_MAPPED_WINDOW, SOURCE_TEXT, SOURCE_TEXT_WINDOW, Finding, Interner,
+                      normalize_path, report_finding)
+from baseline import DEFAULT_BASELINE_PATH, Baseline
+from ignore_rules import DEFAULT_IGNORE_FILE, IgnoreMatcher
+from python_tokens import TOKEN_CLASSES, PythonSource
+from findings_sink import JsonLinesSink, new_summary, write_report
+from sarif_writer import finding_fingerprint, normalize_match, write_sarif
+from scan_cache import DEFAULT_CACHE_PATH, ScanCache
+from watch_mode import DEFAULT_POLL_INTERVAL, WATCH_BACKENDS, watch
+
+# Leading global inline flags such as "(?i)" must become scoped groups once a
+# rule is embedded inside the combined alternation
+GLOBAL_FLAGS_RE = re.compile(r'^\(\?([aiLmsux]+)\)')
+
+# Numbered or named backreferences cannot survive being renumbered inside the
+# combined pattern, so rules using them are matched on their own
+BACKREFERENCE_RE = re.compile(r'\\[1-9]|\(\?P=')
+
+# Files at least this large are matched as bytes over an mmap instead of being
+# decoded into memory first
+DEFAULT_MMAP_THRESHOLD = 16 * 1024 * 1024
+
+# Granularity of the newline checkpoints kept for memory-mapped files
+MAPPED_BLOCK_SIZE = 64 * 1024
+
+# Bytes lowered at a time when prefiltering a memory-mapped file
+PREFILTER_CHUNK_SIZE = 1024 * 1024
+
+# Pre-scan triage: bytes sampled from the start of each file, the size above
+# which files are skipped, and the line-length limits that trigger restricted mode.
+# Files that large are matched over mmap in flat memory, so the size limit
+# only bounds scan time (see --max-file-size)
+TRIAGE_SAMPLE_SIZE = 8 * 1024
+DEFAULT_MAX_FILE_SIZE = 1024 * 1024 * 1024
+LONG_LINE_LENGTH = 2000
+MINIFIED_AVERAGE_LINE_LENGTH = 300
+
+# In restricted mode unbounded repeats are capped at this many characters and
+# context is clipped to this many characters either side of the match
+RESTRICTED_REPEAT_LIMIT = 256
+RESTRICTED_CONTEXT_WIDTH = 200
+
+# Fingerprints hash the line the match starts on, clipped to this many
+# characters either side of the start so minified lines stay cheap (see
+# sarif_writer.finding_fingerprint)
+FINGERPRINT_WIDTH = 200
+
+DEFAULT_SARIF_PATH = 'custom-security-results.sarif'
+
+# Number of slowest files and rules listed in the --profile report
+DEFAULT_PROFILE_TOP = 20
+
+# Default wall-clock budget for one rule on one file, in seconds; a file
+# takes at most one budget per matching pass plus one per rule (see RuleEngine.scan)
+DEFAULT_RULE_TIMEOUT = 5.0
+
+# Tokens of the path globs accepted in EXCLUDE_FILES, see glob_to_regex
+GLOB_TOKEN_RE = re.compile(r'\*\*/|\*\*|\*|\?|\[[^\]]*\]|[^*?\[]+|.')
+GLOB_CHARS = frozenset('*?[')
+
+CWE_ID_RE = re.compile(r'^CWE-\d+$')
+RULE_KEYS = ('pattern', 'severity', 'cwe', 'description')
+
+QUANTIFIER_BRACES_RE = re.compile(r'\{(\d*)(,?)(\d*)\}')
+
+REPEAT_OPS = tuple(
+    getattr(sre_parse, name) for name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT')
+    if hasattr(sre_parse, name)
+)
+
+# Languages a rule's "languages" list can name; security_config.LANGUAGE_EXTENSIONS
+# adds to or overrides these. A rule may also list extensions directly.
+BUILTIN_LANGUAGES = {
+    'python': ('.py',),
+    'javascript': ('.js', '.jsx'),
+    'typescript': ('.ts', '.tsx'),
+    'php': ('.php',),
+    'java': ('.java',),
+    'csharp': ('.cs',),
+    'ruby': ('.rb',),
+    'go': ('.go',),
+    'c': ('.c', '.h'),
+    'cpp': ('.cpp', '.h'),
+    'swift': ('.swift',),
+    'kotlin': ('.kt',)
+}
+
+# Rules every scan runs; security_config.CUSTOM_PATTERNS adds to these.
+# Rules with a "languages" list only run on files of those languages.
+BUILTIN_PATTERNS = {
+    'hardcoded_secrets': {
+        'pattern': r'(?i)(password|secret|key|token|api_key)\s*[=:]\s*["\']([^"\']{8,})["\']',
+        'severity': 'HIGH',
+        'cwe': 'CWE-798',
+        'description': 'Potential hardcoded secret or credential'
+    },
+    'sql_injection': {
+        # SECURITY_SCANNER_PATTERN: This is a regex pattern to detect SQL injection, not actual SQL injection
+        'pattern': r'(?i)(SELECT|INSERT|UPDATE|DELETE).*\+.*["\']',  # Pattern for SQL + string concatenation
+        'severity': 'HIGH',
+        'cwe': 'CWE-89',
+        'description': 'Potential SQL injection vulnerability'
+    },
+    'xss_vulnerability': {
+        'pattern': r'(?i)innerHTML\s*=\s*[^;]*\+|document\.write\s*\([^)]*\+',
+        'severity': 'MEDIUM',
+        'cwe': 'CWE-79',
+        'description': 'Potential XSS vulnerability',
+        # DOM APIs, so only where browser code is written
+        'languages': ['javascript', 'typescript', 'php']
+    },
+    'insecure_http': {
+        # SECURITY_SCANNER_PATTERN: This is a regex pattern to detect HTTP usage, not actual HTTP usage
+        'pattern': r'http://(?!localhost|127\.0\.0\.1|0\.0\.0\.0)',  # Pattern for non-local HTTP URLs
+        'severity': 'MEDIUM',
+        'cwe': 'CWE-319',
+        'description': 'Insecure HTTP connection'
+    },
+    'weak_crypto': {
+        'pattern': r'(?i)(md5|sha1)\s*\(',
+        'severity': 'MEDIUM',
+        'cwe': 'CWE-327',
+        'description': 'Weak cryptographic algorithm'
+    },
+    'command_injection': {
+        'pattern': r'(?i)(exec|eval|system|shell_exec|passthru)\s*\([^)]*\$',
+        'severity': 'CRITICAL',
+        'cwe': 'CWE-78',
+        'description': 'Potential command injection vulnerability',
+        # Languages where $ interpolates variables into the command string
+        'languages': ['php', 'javascript', 'typescript', 'kotlin']
+    },
+    'path_traversal': {
+        'pattern': r'\.\.\/|\.\.\\',
+        'severity': 'HIGH',
+        'cwe': 'CWE-22',
+        'description': 'Potential path traversal vulnerability'
+    },
+    'insecure_random': {
+        'pattern': r'(?i)(math\.random|random\.seed\(|mt_rand\()',
+        'severity': 'LOW',
+        'cwe': 'CWE-330',
+        'description': 'Use of cryptographically weak random number generator',
+        'languages': ['javascript', 'typescript', 'java', 'kotlin', 'python', 'php']
+    }
+}
+
+
+def compile_pattern(pattern, flags=0, binary=False):
+    """Compile a rule pattern for text or, encoded as UTF-8, for bytes input"""
+    return re.compile(pattern.encode('utf-8') if binary else pattern, flags)
+
+
+def decode_text(data):
+    """Decode bytes from a mapped file the way the text path reads them"""
+    return data.decode('utf-8', errors='ignore').replace('\r\n', '\n')
+
+
+class MatchTimeout(Exception):
+    """Raised inside a regex call when its time budget runs out"""
+
+
+@contextlib.contextmanager
+def time_budget(seconds):
+    """Interrupt the enclosed matching with MatchTimeout after ``seconds``
+
+    The budget is enforced by an interval timer outside the regex call; the
+    re module checks for pending signals while matching, so even a
+    backtracking search is stopped. SIGALRM only exists on POSIX and can only
+    be handled in the main thread, so elsewhere the block runs unbounded.
+    """
+    if (not seconds or not hasattr(signal, 'setitimer')
+            or threading.current_thread() is not threading.main_thread()):
+        yield
+        return
+
+    armed = True
+
+    def expire(signum, frame):
+        if armed:
+            raise MatchTimeout()
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        armed = False
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def scope_flags(pattern):
+    """Rewrite a leading global flag group so the pattern can be embedded"""
+    flags = GLOBAL_FLAGS_RE.match(pattern)
+    if flags:
+        return f'(?{flags.group(1)}:{pattern[flags.end():]})'
+    return pattern
+
+
+def is_mergeable(pattern, regex):
+    """Whether a rule can join the combined alternation
+
+    Backreferences would point at shifted group numbers, and named groups
+    could be defined by more than one rule, so such rules match on their own.
+    """
+    return not BACKREFERENCE_RE.search(pattern) and not regex.groupindex
+
+
+def bound_repeats(pattern, limit):
+    """Rewrite unbounded quantifiers (*, +, {m,}) as {m,limit}
+
+    Restricted mode uses this so a rule can backtrack over at most ``limit``
+    characters per repeat, however long the line is.
+    """
+    out = []
+    index = 0
+    after_atom = False
+    after_quantifier = False
+    while index < len(pattern):
+        char = pattern[index]
+        if char == '\\':
+            out.append(pattern[index:index + 2])
+            index += 2
+            after_atom, after_quantifier = True, False
+            continue
+        if char == '[':
+            end = index + 1
+            if pattern[end:end + 1] == '^':
+                end += 1
+            if pattern[end:end + 1] == ']':
+                end += 1
+            while end < len(pattern) and pattern[end] != ']':
+                end += 2 if pattern[end] == '\\' else 1
+            out.append(pattern[index:end + 1])
+            index = end + 1
+            after_atom, after_quantifier = True, False
+            continue
+
+        braces = QUANTIFIER_BRACES_RE.match(pattern, index) if char == '{' and after_atom else None
+        if after_quantifier and char in '?+':
+            # Lazy or possessive modifier of the quantifier just emitted
+            out.append(char)
+            after_quantifier = False
+        elif after_atom and char in '*+':
+            out.append(f'{{{0 if char == "*" else 1},{limit}}}')
+            after_atom, after_quantifier = False, True
+        elif after_atom and char == '?':
+            out.append(char)
+            after_atom, after_quantifier = False, True
+        elif braces and braces.group(1) and braces.group(2) and not braces.group(3):
+            minimum = int(braces.group(1))
+            out.append(f'{{{minimum},{max(minimum, limit)}}}')
+            index = braces.end()
+            after_atom, after_quantifier = False, True
+            continue
+        elif braces and (braces.group(1) or braces.group(3)):
+            out.append(braces.group(0))
+            index = braces.end()
+            after_atom, after_quantifier = False, True
+            continue
+        else:
+            out.append(char)
+            after_atom = char not in '(|'
+            after_quantifier = False
+        index += 1
+    return ''.join(out)
+
+
+def compile_marker_matcher(patterns, binary=False):
+    """Compile ignore-marker patterns into one regex used only for searching
+
+    A leading or trailing ``.*`` never changes whether a search succeeds, but it
+    makes the search quadratic on long lines, so it is dropped.
+    """
+    alternatives = []
+    for pattern in patterns:
+        pattern = scope_flags(pattern)
+        if pattern.startswith('.*') and pattern[2:3] not in ('?', '+', '*', '{'):
+            pattern = pattern[2:]
+        if pattern.endswith('.*') and not pattern.endswith('\\.*'):
+            pattern = pattern[:-2]
+        alternatives.append(f'(?:{pattern})')
+    return compile_pattern('|'.join(alternatives) if alternatives else r'(?!)', binary=binary)
+
+
+class LineIndex:
+    """Sorted newline offsets for one file, built once and shared by all rules"""
+
+    def __init__(self, content):
+        self.content = content
+        self.starts = [0]
+        find = content.find
+        newline = find('\n')
+        while newline != -1:
+            self.starts.append(newline + 1)
+            newline = find('\n', newline + 1)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def line_number(self, offset):
+        """1-based line number containing ``offset``"""
+        return bisect.bisect_right(self.starts, offset)
+
+    def lines(self, first, last):
+        """Text of 1-based lines ``first`` through ``last`` joined by newlines"""
+        end = self.starts[last] - 1 if last < len(self.starts) else len(self.content)
+        return self.content[self.starts[first - 1]:end]
+
+    def line(self, line_num):
+        """Text of a single 1-based line without its newline"""
+        return self.lines(line_num, line_num)
+
+    def context(self, line_num, before=1, after=3):
+        """The matched line with the surrounding lines reported as context"""
+        first = max(1, line_num - before)
+        last = min(len(self.starts), line_num + after)
+        return self.lines(first, last)
+
+    def window(self, start, end, width):
+        """The matched line clipped to ``width`` characters around a match"""
+        line_num = self.line_number(start)
+        line_start = self.starts[line_num - 1]
+        line_end = self.starts[line_num] - 1 if line_num < len(self.starts) else len(self.content)
+        return self.content[max(line_start, start - width):min(line_end, end + width)]
+
+
+class MappedLineIndex:
+    """Line lookups over a memory-mapped file without indexing every newline
+
+    Only the newline count at the start of each fixed-size block is kept, so
+    memory stays flat however many lines the file has. Lines are decoded on
+    demand for the finding record.
+    """
+
+    def __init__(self, buffer, block_size=MAPPED_BLOCK_SIZE):
+        self.buffer = buffer
+        self.block_size = block_size
+        self.checkpoints = [0]
+        for block_start in range(0, len(buffer), block_size):
+            self.checkpoints.append(self.checkpoints[-1] + buffer[block_start:block_start + block_size].count(b'\n'))
+
+    def line_number(self, offset):
+        """1-based line number containing ``offset``"""
+        block = offset // self.block_size
+        block_start = block * self.block_size
+        return self.checkpoints[block] + self.buffer[block_start:offset].count(b'\n') + 1
+
+    def _span(self, offset, before, after):
+        start = self.buffer.rfind(b'\n', 0, offset) + 1
+        for _ in range(before):
+            if start == 0:
+                break
+            start = self.buffer.rfind(b'\n', 0, start - 1) + 1
+        end = self.buffer.find(b'\n', offset)
+        for _ in range(after):
+            if end == -1:
+                break
+            end = self.buffer.find(b'\n', end + 1)
+        if end == -1:
+            return decode_text(self.buffer[start:])
+        # Drop the CR of a final CRLF, which the text path folds into the newline
+        return decode_text(self.buffer[start:end]).removesuffix('\r')
+
+    def line_at(self, offset):
+        """Text of the line containing ``offset`` without its newline"""
+        return self._span(offset, 0, 0)
+
+    def context_at(self, offset, before=1, after=3):
+        """The line containing ``offset`` with the surrounding context lines"""
+        return self._span(offset, before, after)
+
+    def window_at(self, start, end, width):
+        """The matched line clipped to ``width`` bytes around a match"""
+        window_start = max(0, start - width)
+        window_start = self.buffer.rfind(b'\n', window_start, start) + 1 or window_start
+        window_end = self.buffer.find(b'\n', end, end + width)
+        if window_end == -1:
+            window_end = min(len(self.buffer), end + width)
+        return decode_text(self.buffer[window_start:window_end]).removesuffix('\r')
+
+
+class FindingSource:
+    """One scanned file reopened to render its compact findings back into text
+
+    The file is read the same way it was scanned, so offsets recorded during
+    the scan select the same match and context. A file edited between the scan
+    and the report renders from its new contents. A file deleted or emptied
+    in between renders with empty match text and context instead of failing
+    the whole report.
+    """
+
+    def __init__(self, file_path, mode):
+        self.mode = mode
+        self.file = None
+        self.buffer = None
+        try:
+            if mode in (SOURCE_MAPPED, SOURCE_MAPPED_WINDOW):
+                self.file = open(file_path, 'rb')
+                self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+                self.index = MappedLineIndex(self.buffer)
+            else:
+                with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
+                    self.index = LineIndex(file.read())
+        except (OSError, ValueError) as e:
+            # ValueError is mmap refusing a file that is now empty
+            print(f"Cannot reread {file_path} for finding context: {e}")
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            self.mode = SOURCE_TEXT
+            self.index = LineIndex('')
+
+    def match_text(self, finding):
+        """Matched text, truncated like the original finding record"""
+        if self.buffer is not None:
+            return decode_text(self.buffer[finding.start:finding.end])[:100]
+        return self.index.content[finding.start:finding.end][:100]
+
+    def fingerprint_line(self, finding):
+        """The line the match starts on, clipped to FINGERPRINT_WIDTH as the scan numbered it"""
+        if self.buffer is not None:
+            return self.index.window_at(finding.start, finding.start, FINGERPRINT_WIDTH)
+        return self.index.window(finding.start, finding.start, FINGERPRINT_WIDTH)
+
+    def context(self, finding):
+        """Context lines, or the clipped window for restricted-mode files"""
+        if self.mode == SOURCE_TEXT:
+            # The file may have lost the line since it was scanned
+            if finding.line > len(self.index):
+                return ''
+            return self.index.context(finding.line)
+        if self.mode == SOURCE_TEXT_WINDOW:
+            return self.index.window(finding.start, finding.end, RESTRICTED_CONTEXT_WIDTH)
+        if self.mode == SOURCE_MAPPED:
+            return self.index.context_at(finding.start)
+        return self.index.window_at(finding.start, finding.end, RESTRICTED_CONTEXT_WIDTH)
+
+    def close(self):
+        if self.buffer is not None:
+            self.buffer.close()
+            self.file.close()
+
+
+def required_literals(pattern):
+    """Literals of which at least one must occur in any text the pattern matches
+
+    Returns a set of strings, or None when no such literal can be derived (for
+    example a pattern that starts with a character class). Literals are raw;
+    callers fold case themselves, which keeps the check conservative for both
+    case-sensitive and ``(?i)`` rules.
+    """
+    try:
+        return _sequence_literals(sre_parse.parse(pattern))
+    except (re.error, TypeError, ValueError):
+        return None
+
+
+def _sequence_literals(items):
+    best = None
+    run = []
+
+    def consider(candidate):
+        nonlocal best
+        if not candidate or '' in candidate:
+            return
+        # Prefer the most selective requirement: longest shortest alternative
+        key = (min(len(literal) for literal in candidate), -len(candidate))
+        if best is None or key > (min(len(literal) for literal in best), -len(best)):
+            best = candidate
+
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            run.append(chr(av))
+            continue
+        consider({''.join(run)})
+        run = []
+        if op is sre_parse.SUBPATTERN:
+            consider(_sequence_literals(av[-1]))
+        elif op is sre_parse.BRANCH:
+            branches = [_sequence_literals(branch) for branch in av[1]]
+            if all(branches):
+                consider(set().union(*branches))
+        elif op in REPEAT_OPS and av[0] >= 1:
+            consider(_sequence_literals(av[2]))
+    consider({''.join(run)})
+    return best
+
+
+class RuleEngine:
+    """Compiled matcher that walks a file once for every active rule
+
+    All mergeable rules are joined into a single named-group alternation. The
+    combined pattern only locates candidate offsets; at each offset the rules
+    that can still match there are confirmed with their own precompiled regex,
+    which keeps per-rule results identical to a dedicated ``re.finditer`` pass.
+
+    Before matching, a keyword prefilter looks for the literals each rule
+    requires. Rules whose literals are all absent are left out of the combined
+    pattern for that file; one alternation is compiled per distinct set of
+    active rules and reused.
+    """
+
+    def __init__(self, patterns, binary=False):
+        self.source = {name: dict(config) for name, config in patterns.items()}
+        self.rules = list(self.source.items())
+        self.binary = binary
+        self.fingerprint = hashlib.sha256(
+            json.dumps(self.source, sort_keys=True).encode('utf-8')
+        ).hexdigest()
+        self.regexes = [compile_pattern(config['pattern'], re.MULTILINE, binary) for _, config in self.rules]
+        self.line_regexes = [
+            compile_pattern(bound_repeats(config['pattern'], RESTRICTED_REPEAT_LIMIT), re.MULTILINE, binary)
+            for _, config in self.rules
+        ]
+        self.mergeable = [
+            is_mergeable(config['pattern'], regex) for (_, config), regex in zip(self.rules, self.regexes)
+        ]
+
+        # Keywords are folded the way the content will be: ASCII lower() for
+        # bytes, whose (?i) matching is ASCII-only, and casefold() for text
+        self.literals = []
+        for _, config in self.rules:
+            literals = required_literals(config['pattern'])
+            if literals is not None:
+                literals = {literal.encode('utf-8').lower() if binary else literal.casefold() for literal in literals}
+            self.literals.append(literals)
+        self.keywords = sorted(set().union(*(literals for literals in self.literals if literals)))
+        self.all_rules = tuple(range(len(self.rules)))
+        self._plans = {}
+
+    def compile_combined(self):
+        """Compile the alternation of every rule now, raising re.error if they cannot be combined"""
+        self._plan(self.all_rules)
+
+    def present_keywords(self, content):
+        """Rule keywords that occur anywhere in the content, ignoring case"""
+        if not self.keywords:
+            return set()
+        if not self.binary:
+            folded = content.casefold()
+            return {keyword for keyword in self.keywords if keyword in folded}
+
+        # Mapped files are lowered chunk by chunk so the check stays in flat memory
+        remaining = set(self.keywords)
+        present = set()
+        overlap = max(len(keyword) for keyword in remaining) - 1
+        for chunk_start in range(0, len(content), PREFILTER_CHUNK_SIZE):
+            chunk = content[max(0, chunk_start - overlap):chunk_start + PREFILTER_CHUNK_SIZE].lower()
+            found = {keyword for keyword in remaining if keyword in chunk}
+            present |= found
+            remaining -= found
+            if not remaining:
+                break
+        return present
+
+    def active_rules(self, content):
+        """Indexes of the rules whose required literals occur in the content"""
+        present = self.present_keywords(content)
+        return tuple(
+            index for index, literals in enumerate(self.literals)
+            if literals is None or not literals.isdisjoint(present)
+        )
+
+    def _plan(self, active):
+        """Combined pattern for one set of active rules, compiled on first use"""
+        plan = self._plans.get(active)
+        if plan is None:
+            merged = [index for index in active if self.mergeable[index]]
+            standalone = [index for index in active if not self.mergeable[index]]
+            alternatives = [f'(?P<r{index}>{scope_flags(self.rules[index][1]["pattern"])})' for index in merged]
+            combined = compile_pattern('|'.join(alternatives), re.MULTILINE, self.binary) if alternatives else None
+            group_index = {f'r{index}': position for position, index in enumerate(merged)}
+            plan = self._plans[active] = (combined, merged, standalone, group_index)
+        return plan
+
+    def scan(self, content, prefilter=True, timeout=None, diagnostics=None, profile=None):
+        """Yield (rule_name, rule_config, matches) for every rule in declaration order
+
+        With a timeout, the combined pass gets a single rule's budget. If it
+        runs out, each rule is rematched on a budget of its own, which also
+        covers its line-bounded fallback (see _scan_rule). Matching one content
+        therefore takes at most (1 + active rules) x timeout.
+
+        Passing a ``profile`` dict runs every active rule as its own pass so
+        that wall time, regex invocations and matches can be attributed per
+        rule; results are the same as the combined pass.
+        """
+        if profile is not None:
+            started = time.perf_counter()
+        active = self.active_rules(content) if prefilter else self.all_rules
+
+        if profile is not None:
+            profile['prefilter_seconds'] = time.perf_counter() - started
+            profile['rules'] = {}
+            hits = self._scan_separately(content, active, timeout, diagnostics, profile['rules'])
+        elif not timeout:
+            hits = self._scan_combined(content, active)
+        else:
+            try:
+                with time_budget(timeout):
+                    hits = self._scan_combined(content, active)
+            except MatchTimeout:
+                hits = self._scan_separately(content, active, timeout, diagnostics)
+
+        for index, (rule_name, rule_config) in enumerate(self.rules):
+            yield rule_name, rule_config, hits[index]
+
+    def _scan_combined(self, content, active):
+        hits = [[] for _ in self.rules]
+        combined, merged, standalone, group_index = self._plan(active)
+
+        if combined is not None:
+            regexes = self.regexes
+            cursors = [0] * len(merged)
+            search = combined.search
+            pos = 0
+            # search() clamps pos to the end, so an empty match there would repeat forever
+            end = len(content)
+            while pos <= end:
+                candidate = search(content, pos)
+                if candidate is None:
+                    break
+                start = candidate.start()
+                first = group_index[candidate.lastgroup]
+
+                # Rules earlier in the alternation cannot match at this offset;
+                # later ones may, unless their previous match already covers it
+                for position in range(first, len(merged)):
+                    if cursors[position] > start:
+                        continue
+                    index = merged[position]
+                    if position == first:
+                        match = candidate
+                    else:
+                        match = regexes[index].match(content, start)
+                        if match is None:
+                            continue
+                    hits[index].append(match)
+                    cursors[position] = match.end() if match.end() > start else start + 1
+                pos = start + 1
+
+        for index in standalone:
+            hits[index].extend(self.regexes[index].finditer(content))
+        return hits
+
+    def _scan_separately(self, content, active, timeout, diagnostics, rule_profiles=None):
+        hits = [[] for _ in self.rules]
+        for index in active:
+            started = time.perf_counter()
+            invocations = self._scan_rule(index, content, timeout, diagnostics, hits[index])
+            if rule_profiles is not None:
+                rule_profiles[self.rules[index][0]] = {
+                    'seconds': time.perf_counter() - started,
+                    'invocations': invocations,
+                    'matches': len(hits[index])
+                }
+        return hits
+
+    def _scan_rule(self, index, content, timeout, diagnostics, hits):
+        """Match one rule within ``timeout``, returning the number of regex calls made
+
+        The full match may use half the budget. If it runs out, line-bounded
+        matching gets what is left, so the rule never takes longer than
+        ``timeout`` in total.
+        """
+        deadline = time.perf_counter() + timeout if timeout else None
+        try:
+            with time_budget(timeout / 2 if timeout else None):
+                hits.extend(self.regexes[index].finditer(content))
+            # finditer makes one search per match plus the one that fails
+            return len(hits) + 1
+        except MatchTimeout:
+            hits.clear()
+
+        message = f'rule timed out after {timeout / 2:g}s, fell back to line-bounded matching'
+        invocations = 1
+        try:
+            # A tiny floor, since a budget of 0 would mean no limit at all
+            with time_budget(max(deadline - time.perf_counter(), 0.001)):
+                invocations += self._scan_lines(index, content, hits)
+        except MatchTimeout:
+            message = f'rule timed out after {timeout:g}s, also in line-bounded matching; results are partial'
+        if diagnostics is not None:
+            diagnostics.append({'rule': self.rules[index][0], 'message': message})
+        return invocations
+
+    def _scan_lines(self, index, content, hits):
+        """Match one rule line by line with bounded repeats, appending to hits
+
+        Returns the number of regex calls made.
+        """
+        regex = self.line_regexes[index]
+        newline = b'\n' if self.binary else '\n'
+        invocations = 0
+        line_start = 0
+        while line_start <= len(content):
+            line_end = content.find(newline, line_start)
+            if line_end == -1:
+                line_end = len(content)
+            before = len(hits)
+            hits.extend(regex.finditer(content, line_start, line_end))
+            invocations += len(hits) - before + 1
+            line_start = line_end + 1
+        return invocations
+
+
+def glob_to_regex(glob):
+    """Translate a path glob into a regex for a whole forward-slash path
+
+    ``**/`` matches any number of leading directories, ``*`` and ``?`` stay
+    within one path segment.
+    """
+    parts = []
+    for token in GLOB_TOKEN_RE.findall(glob):
+        if token == '**/':
+            parts.append('(?:.*/)?')
+        elif token == '**':
+            parts.append('.*')
+        elif token == '*':
+            parts.append('[^/]*')
+        elif token == '?':
+            parts.append('[^/]')
+        elif token.startswith('[') and len(token) > 2:
+            body = token[1:-1]
+            if body.startswith('!'):
+                body = '^' + body[1:]
+            parts.append('[' + body.replace('\\', '\\\\') + ']')
+        else:
+            parts.append(re.escape(token))
+    return ''.join(parts)
+
+
+def compile_exclude_files(entries):
+    """One regex for EXCLUDE_FILES, searched against a forward-slash path
+
+    Plain names match anywhere in the path, as they always have; entries with
+    glob characters must match the whole path.
+    """
+    alternatives = []
+    for entry in entries:
+        if GLOB_CHARS.intersection(entry):
+            alternatives.append(f'(?:^{glob_to_regex(entry)}\\Z)')
+        else:
+            alternatives.append(re.escape(entry))
+    return re.compile('|'.join(alternatives) if alternatives else r'(?!)')
+
+
+def validate_config(patterns, extensions, exclude_directories, exclude_files, ignore_patterns, severities,
+                    python_token_scopes=None, languages=None):
+    """Every problem with a scan configuration, as a list of messages"""
+    problems = []
+    languages = languages or {}
+    for name, values in (('SCAN_EXTENSIONS', extensions), ('EXCLUDE_DIRECTORIES', exclude_directories),
+                         ('EXCLUDE_FILES', exclude_files), ('SECURITY_TEST_IGNORE_PATTERNS', ignore_patterns)):
+        if isinstance(values, str) or not all(isinstance(value, str) and value for value in values):
+            problems.append(f"{name} must be a list of non-empty strings")
+
+    for extension in extensions:
+        if isinstance(extension, str) and not extension.startswith('.'):
+            problems.append(f"SCAN_EXTENSIONS entry {extension!r} must start with a dot")
+    for directory in exclude_directories:
+        if isinstance(directory, str) and '/' in directory:
+            problems.append(f"EXCLUDE_DIRECTORIES entry {directory!r} must be a single directory name")
+    for marker in ignore_patterns:
+        try:
+            re.compile(marker)
+        except (re.error, TypeError) as e:
+            problems.append(f"SECURITY_TEST_IGNORE_PATTERNS entry {marker!r} is not a valid regex: {e}")
+
+    for rule_name, rule_config in patterns.items():
+        missing = [key for key in RULE_KEYS if key not in rule_config]
+        if missing:
+            problems.append(f"Rule {rule_name} is missing {', '.join(missing)}")
+            continue
+        try:
+            re.compile(rule_config['pattern'])
+        except (re.error, TypeError) as e:
+            problems.append(f"Rule {rule_name} pattern is not a valid regex: {e}")
+        if rule_config['severity'] not in severities:
+            problems.append(f"Rule {rule_name} severity {rule_config['severity']!r} is not one of {', '.join(severities)}")
+        if not CWE_ID_RE.match(str(rule_config['cwe'])):
+            problems.append(f"Rule {rule_name} cwe {rule_config['cwe']!r} is not of the form CWE-<number>")
+        rule_languages = rule_config.get('languages')
+        if rule_languages is None:
+            continue
+        if isinstance(rule_languages, str) or not all(isinstance(value, str) and value for value in rule_languages):
+            problems.append(f"Rule {rule_name} languages must be a list of language names or extensions")
+            continue
+        for language in rule_languages:
+            if not language.startswith('.') and language not in languages:
+                problems.append(f"Rule {rule_name} language {language!r} is not one of {', '.join(sorted(languages))} "
+                                f"or an extension")
+
+    for language, language_extensions in languages.items():
+        if isinstance(language_extensions, str) or not all(
+                isinstance(extension, str) and extension.startswith('.') for extension in language_extensions):
+            problems.append(f"LANGUAGE_EXTENSIONS entry {language!r} must be a list of extensions starting with a dot")
+
+    if not problems:
+        # Rules are also matched as one alternation, which must compile as well
+        for binary in (False, True):
+            try:
+                RuleEngine(patterns, binary).compile_combined()
+            except (re.error, TypeError, ValueError) as e:
+                problems.append(f"Rules cannot be combined into one {'bytes ' if binary else ''}pattern: {e}")
+                break
+
+    for rule_name, token_class in (python_token_scopes or {}).items():
+        if rule_name not in patterns:
+            problems.append(f"PYTHON_TOKEN_SCOPES entry {rule_name!r} is not a rule")
+        elif token_class not in TOKEN_CLASSES:
+            problems.append(f"PYTHON_TOKEN_SCOPES entry {rule_name!r} must be one of {', '.join(TOKEN_CLASSES)}")
+    return problems
+
+
+class RuleRegistry:
+    """Validated scan configuration with every pattern, glob and marker compiled once
+
+    A checker holds one registry for its whole run and pickles it once into
+    each pool worker, so nothing is re-resolved per file.
+    """
+
+    def __init__(self, patterns, extensions, exclude_directories, exclude_files, ignore_patterns,
+                 severities=('CRITICAL', 'HIGH', 'MEDIUM', 'LOW'), python_token_scopes=None, languages=None):
+        languages = BUILTIN_LANGUAGES if languages is None else languages
+        problems = validate_config(patterns, extensions, exclude_directories, exclude_files, ignore_patterns, severities,
+                                   python_token_scopes, languages)
+        if problems:
+            raise ValueError('Invalid scanner configuration:\n' + '\n'.join(f'  - {problem}' for problem in problems))
+
+        self.patterns = {name: dict(config) for name, config in patterns.items()}
+        self.extensions = tuple(extensions)
+        self.exclude_directories = frozenset(exclude_directories)
+        self.exclude_files = tuple(exclude_files)
+        self.ignore_patterns = tuple(ignore_patterns)
+        self.python_token_scopes = dict(python_token_scopes or {})
+        self.languages = {language: tuple(extensions) for language, extensions in languages.items()}
+
+        self.exclude_file_regex = compile_exclude_files(self.exclude_files)
+        self.ignore_matcher = compile_marker_matcher(self.ignore_patterns)
+        self.bytes_ignore_matcher = compile_marker_matcher(self.ignore_patterns, binary=True)
+
+        # The rules that apply to each scanned extension, in declaration order.
+        # Extensions every rule applies to map to None and share the full
+        # engine; the others share one engine per distinct rule set.
+        self.rule_bundles = {}
+        for extension in self.extensions:
+            bundle = tuple(name for name in self.patterns if self.rule_applies(name, extension))
+            self.rule_bundles[extension] = None if len(bundle) == len(self.patterns) else bundle
+        self._extensions_longest_first = sorted(self.extensions, key=len, reverse=True)
+        self._engines = {}
+
+    @classmethod
+    def from_config(cls, config=security_config):
+        """Built-in rules plus everything tunable in security_config.py"""
+        patterns = dict(BUILTIN_PATTERNS)
+        patterns.update(getattr(config, 'CUSTOM_PATTERNS', {}))
+        languages = dict(BUILTIN_LANGUAGES)
+        languages.update(getattr(config, 'LANGUAGE_EXTENSIONS', {}))
+        return cls(
+            patterns,
+            config.SCAN_EXTENSIONS,
+            config.EXCLUDE_DIRECTORIES,
+            config.EXCLUDE_FILES,
+            config.SECURITY_TEST_IGNORE_PATTERNS,
+            tuple(getattr(config, 'SEVERITY_LEVELS', None) or ('CRITICAL', 'HIGH', 'MEDIUM', 'LOW')),
+            getattr(config, 'PYTHON_TOKEN_SCOPES', None),
+            languages
+        )
+
+    def __getstate__(self):
+        """Leave compiled engines behind; each worker builds its own on first use"""
+        state = self.__dict__.copy()
+        state['_engines'] = {}
+        return state
+
+    def rule_applies(self, rule_name, extension):
+        """Whether a rule's languages (all, if it names none) include an extension"""
+        rule_languages = self.patterns[rule_name].get('languages')
+        if rule_languages is None:
+            return True
+        return any(
+            extension == language if language.startswith('.') else extension in self.languages[language]
+            for language in rule_languages
+        )
+
+    def rule_bundle(self, file_path):
+        """Names of the rules that apply to a file, or None when all of them do"""
+        name = str(file_path)
+        for extension in self._extensions_longest_first:
+            if name.endswith(extension):
+                return self.rule_bundles[extension]
+        return None
+
+    def python_bundles(self, bundle):
+        """Split a rule bundle for .py files into rules matched over the code and "name" rules
+
+        "name" rules are matched over a view with string literals blanked too,
+        so they never run over text they could only report as false positives.
+        """
+        rule_names = self.patterns if bundle is None else bundle
+        name_rules = tuple(name for name in rule_names if self.python_token_scopes.get(name) == 'name')
+        code_rules = tuple(name for name in rule_names if name not in name_rules)
+        return code_rules, name_rules
+
+    def engine(self, binary=False, restricted=False, bundle=None):
+        """Compiled rule engine for one input mode, limited to a rule bundle if given"""
+        key = (binary, restricted, bundle)
+        engine = self._engines.get(key)
+        if engine is None:
+            patterns = self.patterns
+            if bundle is not None:
+                patterns = {name: patterns[name] for name in bundle}
+            if restricted:
+                patterns = {
+                    name: dict(config, pattern=bound_repeats(config['pattern'], RESTRICTED_REPEAT_LIMIT))
+                    for name, config in patterns.items()
+                }
+            engine = self._engines[key] = RuleEngine(patterns, binary)
+        return engine
+
+    def is_excluded_file(self, file_path):
+        """Whether a path matches EXCLUDE_FILES"""
+        return self.exclude_file_regex.search(normalize_path(file_path)) is not None
+
+    def is_scanned_extension(self, name):
+        return name.endswith(self.extensions)
+
 
 class SecurityChecker:
-    def __init__(self):
+    def __init__(self, registry=None):
         self.findings = []
 
-        # Files to exclude from security scanning (test/demo files with intentional vulnerabilities)
-        self.exclude_files = [
-            "test_vulnerable_code.py",  # Security testing file with fake credentials
-            "security_test_samples.py",
-            "test_security_analyzer.py"
-        ]
+        # Optional streaming sink (see findings_sink); when set, findings are
+        # written to it as each file finishes instead of collected in findings
+        self.sink = None
 
-        # Patterns to ignore in security scanning (for test/demo purposes)
-        self.security_test_ignore_patterns = [
-            r"FAKE-DEMO-.*",  # All fake demo credentials
-            r".*DEMO CREDENTIAL.*",  # Demo credential markers
-            r"SECURITY_TEST_IGNORE:",  # Explicit test ignore markers
-        ]
+        # Counters kept up to date as findings are emitted, so the summary
+        # does not need the findings in memory
+        self.summary = new_summary()
+        self.files_with_findings = set()
 
-        # Directories to exclude
-        self.exclude_directories = [
-            "security-analysis",  # Exclude security test files with intentional vulnerabilities
-            ".git", "node_modules", "__pycache__", ".venv", "venv",
-            "dist", "build", ".next", "coverage", "logs", "tmp",
-            ".pytest_cache", ".mypy_cache", "vendor", "packages"
-        ]
+        # Paths (with how each was scanned) and rule metadata shared by all
+        # findings, which hold only IDs into these tables
+        self.files = Interner()
+        self.rules = Interner()
 
-        self.patterns = {
-            'hardcoded_secrets': {
-                'pattern': r'(?i)(password|secret|key|token|api_key)\s*[=:]\s*["\']([^"\']{8,})["\']',
-                'severity': 'HIGH',
-                'cwe': 'CWE-798',
-                'description': 'Potential hardcoded secret or credential'
-            },
-            'sql_injection': {
-                # SECURITY_SCANNER_PATTERN: This is a regex pattern to detect SQL injection, not actual SQL injection
-                'pattern': r'(?i)(SELECT|INSERT|UPDATE|DELETE).*\+.*["\']',  # Pattern for SQL + string concatenation
-                'severity': 'HIGH',
-                'cwe': 'CWE-89',
-                'description': 'Potential SQL injection vulnerability'
-            },
-            'xss_vulnerability': {
-                'pattern': r'(?i)innerHTML\s*=\s*[^;]*\+|document\.write\s*\([^)]*\+',
-                'severity': 'MEDIUM',
-                'cwe': 'CWE-79',
-                'description': 'Potential XSS vulnerability'
-            },
-            'insecure_http': {
-                # SECURITY_SCANNER_PATTERN: This is a regex pattern to detect HTTP usage, not actual HTTP usage
-                'pattern': r'http://(?!localhost|127\.0\.0\.1|0\.0\.0\.0)',  # Pattern for non-local HTTP URLs
-                'severity': 'MEDIUM',
-                'cwe': 'CWE-319',
-                'description': 'Insecure HTTP connection'
-            },
-            'weak_crypto': {
-                'pattern': r'(?i)(md5|sha1)\s*\(',
-                'severity': 'MEDIUM',
-                'cwe': 'CWE-327',
-                'description': 'Weak cryptographic algorithm'
-            },
-            'command_injection': {
-                'pattern': r'(?i)(exec|eval|system|shell_exec|passthru)\s*\([^)]*\$',
-                'severity': 'CRITICAL',
-                'cwe': 'CWE-78',
-                'description': 'Potential command injection vulnerability'
-            },
-            'path_traversal': {
-                'pattern': r'\.\.\/|\.\.\\',
-                'severity': 'HIGH',
-                'cwe': 'CWE-22',
-                'description': 'Potential path traversal vulnerability'
-            },
-            'insecure_random': {
-                'pattern': r'(?i)(math\.random|random\.seed\(|mt_rand\()',
-                'severity': 'LOW',
-                'cwe': 'CWE-330',
-                'description': 'Use of cryptographically weak random number generator'
-            }
+        # In diff mode, the changed lines per file; findings elsewhere are dropped
+        self.line_filter = None
+
+        # Optional Baseline (see baseline.py); findings already in it are not reported
+        self.baseline = None
+        self.baseline_path = None
+
+        # Optional IgnoreMatcher built from .securityignore (and .gitignore),
+        # applied while walking so ignored directories are never entered
+        self.ignore_rules = None
+
+        # File enumeration backend for scan_directory, see file_walk.WALKERS
+        self.walker = DEFAULT_WALKER
+
+        # Rules, extensions, exclusions and ignore markers, loaded from
+        # security_config.py and compiled once (see RuleRegistry)
+        self.registry = registry or RuleRegistry.from_config()
+        self.patterns = self.registry.patterns
+        self.extensions = self.registry.extensions
+        self.exclude_directories = self.registry.exclude_directories
+        self.exclude_files = self.registry.exclude_files
+        self.security_test_ignore_patterns = self.registry.ignore_patterns
+
+        # Size in bytes from which files are scanned through mmap, see scan_mapped_file
+        self.mmap_threshold = DEFAULT_MMAP_THRESHOLD
+
+        # Wall-clock budget per rule per file in seconds (0 disables), see RuleEngine.scan
+        self.rule_timeout = DEFAULT_RULE_TIMEOUT
+
+        # Rules that ran out of time, reported under scan_info
+        self.diagnostics = []
+
+        # Per-rule and per-file timing, collected only when profiling is enabled
+        self.profiling = False
+        self.profile_top = DEFAULT_PROFILE_TOP
+        self.profile = {'files': [], 'rules': {}}
+
+        # Pre-scan triage thresholds, see triage_file
+        self.max_file_size = DEFAULT_MAX_FILE_SIZE
+        self.long_line_length = LONG_LINE_LENGTH
+        self.minified_line_length = MINIFIED_AVERAGE_LINE_LENGTH
+
+        # Files skipped or scanned in restricted mode, reported under scan_info
+        self.triage = {'normal': 0, 'restricted': [], 'skipped': []}
+
+        # Optional ScanCache reused across runs, see main(--cache)
+        self.cache = None
+
+    def __getstate__(self):
+        """Pickle configuration only, so a checker can seed pool workers cheaply"""
+        state = self.__dict__.copy()
+        state['findings'] = []
+        state['sink'] = None
+        state['summary'] = new_summary()
+        state['files_with_findings'] = set()
+        state['files'] = Interner()
+        state['rules'] = Interner()
+        state['triage'] = {'normal': 0, 'restricted': [], 'skipped': []}
+        state['diagnostics'] = []
+        state['profile'] = {'files': [], 'rules': {}}
+        state['cache'] = None
+        state['baseline'] = None
+        return state
+
+    def get_engine(self, binary=False, restricted=False, file_path=None):
+        """Compiled rule engine for one input mode, with only the rules for file_path's extension"""
+        bundle = None if file_path is None else self.registry.rule_bundle(file_path)
+        return self.registry.engine(binary, restricted, bundle)
+
+    def python_engines(self, binary, restricted, file_path):
+        """(engine, strings) for each pass over a .py file, see RuleRegistry.python_bundles
+
+        ``strings`` says whether the pass's view blanks string literals as well
+        as comments and docstrings.
+        """
+        bundles = self.registry.python_bundles(self.registry.rule_bundle(file_path))
+        return [(self.registry.engine(binary, restricted, bundle), strings)
+                for bundle, strings in zip(bundles, (False, True)) if bundle]
+
+    def match_views(self, views, diagnostics=None, profile=None):
+        """Scan each (engine, content) pair and yield (rule_name, rule_config, matches) in declaration order"""
+        hits = {}
+        for engine, content in views:
+            view_profile = None if profile is None else {}
+            for rule_name, rule_config, matches in engine.scan(content, timeout=self.rule_timeout,
+                                                               diagnostics=diagnostics, profile=view_profile):
+                hits[rule_name] = (rule_config, matches)
+            if profile is not None:
+                profile['prefilter_seconds'] = profile.get('prefilter_seconds', 0.0) + view_profile['prefilter_seconds']
+                profile.setdefault('rules', {}).update(view_profile['rules'])
+        for rule_name in self.patterns:
+            if rule_name in hits:
+                rule_config, matches = hits[rule_name]
+                yield rule_name, rule_config, matches
+
+    @property
+    def engine(self):
+        """Compiled rule engine for text input"""
+        return self.registry.engine()
+
+    @property
+    def ignore_matcher(self):
+        """Combined SECURITY_TEST_IGNORE matcher"""
+        return self.registry.ignore_matcher
+
+    @property
+    def bytes_engine(self):
+        """Rule engine compiled for bytes input, used on memory-mapped files"""
+        return self.registry.engine(binary=True)
+
+    @property
+    def bytes_ignore_matcher(self):
+        """SECURITY_TEST_IGNORE matcher compiled for bytes input"""
+        return self.registry.bytes_ignore_matcher
+
+    def rule_fingerprint(self):
+        """Hash of everything that decides a file's findings, used to key the scan cache"""
+        settings = {
+            'rules': self.engine.fingerprint,
+            'exclude_files': list(self.exclude_files),
+            'ignore_patterns': list(self.security_test_ignore_patterns),
+            'python_token_scopes': self.registry.python_token_scopes,
+            'rule_bundles': self.registry.rule_bundles,
+            'triage': [self.max_file_size, self.long_line_length, self.minified_line_length]
         }
+        return hashlib.sha256(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()
 
     def scan_file(self, file_path):
         """Scan a single file for security patterns"""
+        if self.cache is None:
+            self._record(file_path, self.scan_path(file_path))
+            return
+
+        record = self.cache.lookup(file_path)
+        if record is None:
+            record = self.scan_path(file_path)
+            self._cache_store(file_path, record)
+        self._record(file_path, record)
+
+    def _cache_store(self, file_path, record):
+        """Cache a fresh record unless a rule timed out, which depends on machine load"""
+        if not record.get('diagnostics'):
+            self.cache.store(file_path, {key: value for key, value in record.items() if key != 'profile'})
+
+    def _record(self, file_path, record):
+        """Merge one file's scan record into the run's findings, triage and diagnostics"""
+        self.emit(file_path, record.get('source', SOURCE_TEXT), record['findings'])
+        for diagnostic in record.get('diagnostics', ()):
+            self.diagnostics.append(dict(diagnostic, file=str(file_path)))
+        if 'profile' in record:
+            self._record_profile(file_path, record['profile'])
+        triage = record.get('triage')
+        if triage is None:
+            self.triage['normal'] += 1
+        else:
+            self.triage[triage['decision']].append({'file': str(file_path), 'reason': triage['reason']})
+
+    def emit(self, file_path, source, matches):
+        """Count one file's (rule, line, start, end, occurrence) matches and hand them to the sink, or keep them
+
+        Matches become compact Finding records; the sink gets them rendered,
+        since its output is read by other tools while the scan runs.
+        """
+        if self.baseline is not None:
+            # Checked before the diff filter, so baselined findings on
+            # unchanged lines still count as present
+            matches = self._baseline_filter(file_path, source, matches)
+        if self.line_filter is not None:
+            lines = self.line_filter.get(str(file_path), ())
+            matches = [match for match in matches if match[1] in lines]
+        if not matches:
+            return
+
+        file_id = self.files.intern(str(file_path), (str(file_path), source))
+        findings = []
+        for rule_name, line_num, start, end, occurrence in matches:
+            rule_id = self.rules.intern(rule_name, (rule_name, self.patterns[rule_name]))
+            findings.append(Finding(file_id, rule_id, line_num, start, end - start, occurrence))
+
+            self.summary['total'] += 1
+            severity = self.patterns[rule_name]['severity'].lower()
+            if severity in self.summary:
+                self.summary[severity] += 1
+        self.files_with_findings.add(file_id)
+
+        if self.sink is None:
+            self.findings.extend(findings)
+        else:
+            self.sink.write(self.render_findings(findings))
+
+    def _baseline_filter(self, file_path, source, matches):
+        """Drop matches whose fingerprints are in the baseline"""
+        if not matches:
+            self.baseline.check_file(file_path, [])
+            return matches
+        # Fingerprints need the match text, so the file is reopened once for all its matches
+        file_id = self.files.intern(str(file_path), (str(file_path), source))
+        findings = [
+            Finding(file_id, self.rules.intern(rule_name, (rule_name, self.patterns[rule_name])),
+                    line_num, start, end - start, occurrence)
+            for rule_name, line_num, start, end, occurrence in matches
+        ]
+        new = self.baseline.check_file(file_path, list(self.render_findings(findings, context=False)))
+        return [match for match, is_new in zip(matches, new) if is_new]
+
+    def render_findings(self, findings, context=True):
+        """Turn compact findings into report dicts, reopening each file once per run of findings
+
+        With ``context`` false the context lines are left empty, for outputs
+        such as SARIF that do not report them.
+        """
+        source = None
+        source_file_id = None
+        try:
+            for finding in findings:
+                file_path, mode = self.files[finding.file_id]
+                if finding.file_id != source_file_id:
+                    if source is not None:
+                        source.close()
+                        source = None
+                    source_file_id = finding.file_id
+                    source = FindingSource(file_path, mode)
+                    fingerprint_path = normalize_path(file_path)
+                rule_name, rule_config = self.rules[finding.rule_id]
+                record = self._finding(
+                    file_path, finding.line, rule_name, rule_config,
+                    source.match_text(finding), source.context(finding) if context else ''
+                )
+                record['fingerprint'] = finding_fingerprint(
+                    rule_name, fingerprint_path, source.fingerprint_line(finding), finding.occurrence
+                )
+                yield record
+        finally:
+            if source is not None:
+                source.close()
+
+    def iter_findings(self, context=True):
+        """All findings emitted so far as report dicts, read back from the sink when streaming"""
+        if self.sink is None:
+            return self.render_findings(self.findings, context)
+        return iter(self.sink)
+
+    def _record_profile(self, file_path, profile):
+        """Fold one file's timings into the per-file list and per-rule totals"""
+        rule_profiles = profile.get('rules', {})
+        self.profile['files'].append({
+            'file': str(file_path),
+            'seconds': profile['seconds'],
+            'bytes': profile['bytes'],
+            'invocations': sum(rule['invocations'] for rule in rule_profiles.values()),
+            'matches': sum(rule['matches'] for rule in rule_profiles.values())
+        })
+        for rule_name, rule in rule_profiles.items():
+            totals = self.profile['rules'].setdefault(
+                rule_name, {'seconds': 0.0, 'bytes': 0, 'files': 0, 'invocations': 0, 'matches': 0}
+            )
+            totals['seconds'] += rule['seconds']
+            totals['bytes'] += profile['bytes']
+            totals['files'] += 1
+            totals['invocations'] += rule['invocations']
+            totals['matches'] += rule['matches']
+
+    def profile_report(self):
+        """Per-rule totals plus the slowest files and rules, for scan_info"""
+        files = self.profile['files']
+        rules = self.profile['rules']
+        return {
+            'files_profiled': len(files),
+            'seconds': sum(entry['seconds'] for entry in files),
+            'bytes': sum(entry['bytes'] for entry in files),
+            'rules': rules,
+            'slowest_files': sorted(files, key=lambda entry: entry['seconds'], reverse=True)[:self.profile_top],
+            'slowest_rules': sorted(rules, key=lambda name: rules[name]['seconds'], reverse=True)[:self.profile_top]
+        }
+
+    def collect_findings(self, file_path):
+        """Return the findings for a single file without recording them"""
+        return self.scan_path(file_path)['findings']
+
+    def scan_path(self, file_path):
+        """Triage and scan one file, returning its findings and any triage decision"""
+        record = {'findings': []}
+        profile = None
+        if self.profiling:
+            started = time.perf_counter()
+            profile = {'bytes': 0}
         try:
             # Check if file should be excluded
-            if any(exclude_file in str(file_path) for exclude_file in self.exclude_files):
+            if self.registry.is_excluded_file(file_path):
                 print(f"Skipping excluded file: {file_path}")
-                return
+                return record
+
+            size = os.path.getsize(file_path)
+            if profile is not None:
+                profile['bytes'] = size
+            decision, reason = self.triage_file(file_path, size)
+            if decision != 'normal':
+                record['triage'] = {'decision': decision, 'reason': reason}
+                if decision == 'skipped':
+                    print(f"Skipping {reason} file: {file_path}")
+                    return record
+
+            restricted = decision == 'restricted'
+            diagnostics = []
+            if size and size >= self.mmap_threshold:
+                record['source'] = SOURCE_MAPPED_WINDOW if restricted else SOURCE_MAPPED
+                record['findings'] = self.scan_mapped_file(file_path, restricted, diagnostics, profile)
+            else:
+                record['source'] = SOURCE_TEXT_WINDOW if restricted else SOURCE_TEXT
+                record['findings'] = self.scan_text_file(file_path, restricted, diagnostics, profile)
+            if diagnostics:
+                record['diagnostics'] = diagnostics
+                for diagnostic in diagnostics:
+                    print(f"Rule {diagnostic['rule']} on {file_path}: {diagnostic['message']}")
+        except Exception as e:
+            print(f"Error scanning {file_path}: {e}")
+        if profile is not None:
+            profile['seconds'] = time.perf_counter() - started
+            record['profile'] = profile
+        return record
+
+    def triage_file(self, file_path, size):
+        """Decide from the size and first few KB of a file how to scan it
+
+        Returns (decision, reason) where decision is 'normal', 'restricted' for
+        minified or long-line files, or 'skipped' for oversized or binary ones.
+        """
+        if self.max_file_size and size > self.max_file_size:
+            return 'skipped', 'oversized'
+
+        with open(file_path, 'rb') as file:
+            sample = file.read(TRIAGE_SAMPLE_SIZE)
+        if b'\x00' in sample:
+            return 'skipped', 'binary'
+
+        lines = sample.split(b'\n')
+        if max(len(line) for line in lines) >= self.long_line_length:
+            return 'restricted', 'long-lines'
+        if len(sample) / len(lines) >= self.minified_line_length:
+            return 'restricted', 'minified'
+        return 'normal', None
+
+    def scan_text_file(self, file_path, restricted=False, diagnostics=None, profile=None):
+        """Decode a file and match every rule against its text
+
+        Returns (rule_name, line, start, end, occurrence) for each match not on
+        an ignored line. In restricted mode unbounded repeats are capped and
+        context is clipped to the matched line, so minified or very long lines
+        stay cheap.
+        """
+        findings = []
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
+            content = file.read()
+
+        # Check for SECURITY_TEST_IGNORE markers in file content
+        ignore_matcher = self.ignore_matcher
+        if ignore_matcher.search(content):
+            print(f"Skipping file with SECURITY_TEST_IGNORE markers: {file_path}")
+            return findings
+
+        line_index = LineIndex(content)
+        ignored_lines = {}
+        # Numbered before any baseline or diff filtering, see Finding.occurrence
+        occurrences = {}
 
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-                content = file.read()
+        # Python is lexed once; rules then match the code without comments
+        # and docstrings ("name" rules without any string literal either),
+        # and scoped rules only keep matches in their token class (see
+        # PYTHON_TOKEN_SCOPES)
+        python_source = None
+        token_scopes = {}
+        if str(file_path).endswith('.py'):
+            python_source = PythonSource(content)
+            token_scopes = self.registry.python_token_scopes
+            views = [(engine, python_source.text_view(strings))
+                     for engine, strings in self.python_engines(False, restricted, file_path)]
+        else:
+            views = [(self.get_engine(restricted=restricted, file_path=file_path), content)]
 
-            # Check for SECURITY_TEST_IGNORE markers in file content
-            if any(re.search(pattern, content) for pattern in self.security_test_ignore_patterns):
+        for rule_name, rule_config, matches in self.match_views(views, diagnostics, profile):
+            token_class = token_scopes.get(rule_name)
+            for match in matches:
+                if token_class and not python_source.in_scope(token_class, match.start(), match.end()):
+                    continue
+                line_num = line_index.line_number(match.start())
+
+                # Check if this specific match should be ignored
+                if line_num not in ignored_lines:
+                    ignored_lines[line_num] = bool(ignore_matcher.search(line_index.line(line_num)))
+                if ignored_lines[line_num]:
+                    print(f"Ignoring finding in {file_path}:{line_num} due to SECURITY_TEST_IGNORE marker")
+                    continue
+
+                fingerprint_line = line_index.window(match.start(), match.start(), FINGERPRINT_WIDTH)
+                key = (rule_name, normalize_match(fingerprint_line))
+                occurrences[key] = occurrences.get(key, 0) + 1
+                findings.append((rule_name, line_num, match.start(), match.end(), occurrences[key]))
+        return findings
+
+    def scan_mapped_file(self, file_path, restricted=False, diagnostics=None, profile=None):
+        """Match rules as bytes directly over an mmap of a large file
+
+        Only matched lines are decoded, so peak memory does not grow with file
+        size. Results equal the text path for UTF-8 input,
+        except that character classes such as \\s only cover ASCII.
+
+        Python files are lexed over the bytes and blanked in private
+        copy-on-write maps, so only pages holding comments or strings are copied.
+        """
+        findings = []
+        with contextlib.ExitStack() as stack:
+            file = stack.enter_context(open(file_path, 'rb'))
+            content = stack.enter_context(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+            if self.bytes_ignore_matcher.search(content):
                 print(f"Skipping file with SECURITY_TEST_IGNORE markers: {file_path}")
-                return
+                return findings
 
-            for rule_name, rule_config in self.patterns.items():
-                matches = re.finditer(rule_config['pattern'], content, re.MULTILINE)
-                for match in matches:
-                    line_num = content[:match.start()].count('\n') + 1
+            line_index = MappedLineIndex(content)
+            ignore_matcher = self.ignore_matcher
+            ignored_lines = {}
+            occurrences = {}
 
-                    # Get some context around the match
-                    lines = content.split('\n')
-                    start_line = max(0, line_num - 2)
-                    end_line = min(len(lines), line_num + 3)
-                    context = '\n'.join(lines[start_line:end_line])
+            # Same passes as scan_text_file, with byte offsets throughout
+            python_source = None
+            token_scopes = {}
+            if str(file_path).endswith('.py'):
+                python_source = PythonSource(content)
+                token_scopes = self.registry.python_token_scopes
+                views = []
+                for engine, strings in self.python_engines(True, restricted, file_path):
+                    view = stack.enter_context(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY))
+                    python_source.blank_into(view, strings)
+                    views.append((engine, view))
+            else:
+                views = [(self.get_engine(True, restricted, file_path), content)]
 
-                    # Check if this specific match should be ignored
-                    match_line = lines[line_num - 1] if line_num <= len(lines) else ""
-                    if any(re.search(pattern, match_line) for pattern in self.security_test_ignore_patterns):
+            for rule_name, rule_config, matches in self.match_views(views, diagnostics, profile):
+                token_class = token_scopes.get(rule_name)
+                for match in matches:
+                    if token_class and not python_source.in_scope(token_class, match.start(), match.end()):
+                        continue
+                    line_num = line_index.line_number(match.start())
+
+                    if line_num not in ignored_lines:
+                        ignored_lines[line_num] = bool(ignore_matcher.search(line_index.line_at(match.start())))
+                    if ignored_lines[line_num]:
                         print(f"Ignoring finding in {file_path}:{line_num} due to SECURITY_TEST_IGNORE marker")
                         continue
 
-                    self.findings.append({
-                        'file': str(file_path),
-                        'line': line_num,
-                        'rule': rule_name,
-                        'severity': rule_config['severity'],
-                        'cwe': rule_config['cwe'],
-                        'match': match.group(0)[:100],  # Truncate long matches
-                        'context': context,
-                        'description': rule_config['description']
-                    })
-        except Exception as e:
-            print(f"Error scanning {file_path}: {e}")
+                    fingerprint_line = line_index.window_at(match.start(), match.start(), FINGERPRINT_WIDTH)
+                    key = (rule_name, normalize_match(fingerprint_line))
+                    occurrences[key] = occurrences.get(key, 0) + 1
+                    findings.append((rule_name, line_num, match.start(), match.end(), occurrences[key]))
+        return findings
 
-    def scan_directory(self, directory):
-        """Scan all supported files in a directory"""
-        extensions = ['.py', '.js', '.ts', '.jsx', '.tsx', '.php', '.java', '.cs', '.rb', '.go', '.cpp', '.c', '.h']
+    def _finding(self, file_path, line_num, rule_name, rule_config, match_text, context):
+        """Build the finding record reported for one rule match"""
+        return report_finding(file_path, line_num, rule_name, rule_config['severity'], rule_config['cwe'],
+                              match_text, context, rule_config['description'])
 
-        for root, dirs, files in os.walk(directory):
-            # Skip directories that shouldn't be scanned (including security-analysis)
-            dirs[:] = [d for d in dirs if d not in self.exclude_directories]
+    def is_supported(self, file_path):
+        """Whether a path has a scanned extension and sits outside excluded directories"""
+        path = Path(file_path)
+        if not self.registry.is_scanned_extension(path.name):
+            return False
+        if not self.exclude_directories.isdisjoint(path.parent.parts):
+            return False
+        return not (self.ignore_rules and self.ignore_rules.is_ignored(path))
 
-            for file in files:
-                if any(file.endswith(ext) for ext in extensions):
-                    file_path = Path(root) / file
-                    self.scan_file(file_path)
+    def iter_files(self, directory, walker=None):
+        """Yield every supported file under a directory
 
-    def generate_report(self):
-        """Generate a summary report of findings"""
-        summary = {
-            'total': len(self.findings),
-            'critical': len([f for f in self.findings if f['severity'] == 'CRITICAL']),
-            'high': len([f for f in self.findings if f['severity'] == 'HIGH']),
-            'medium': len([f for f in self.findings if f['severity'] == 'MEDIUM']),
-            'low': len([f for f in self.findings if f['severity'] == 'LOW'])
+        ``walker`` picks the enumeration backend (default: self.walker):
+        'scandir' and 'walk' yield files in os.walk order, 'git' yields tracked
+        files in git index order.
+        """
+        walk = {'scandir': walk_scandir, 'walk': walk_os, 'git': walk_git}[walker or self.walker]
+        ignore_rules = self.ignore_rules or None
+        if ignore_rules is not None and ignore_rules.is_ignored(directory, is_dir=True):
+            return iter(())
+        return walk(directory, self.extensions, self.exclude_directories, ignore_rules)
+
+    def scratch(self):
+        """Checker with this one's configuration and cache but nothing accumulated
+
+        Watch mode scans each changed file with one, so a file's findings
+        can be replaced without touching the rest of the run.
+        """
+        checker = SecurityChecker.__new__(SecurityChecker)
+        checker.__dict__.update(self.__getstate__())
+        checker.cache = self.cache
+        return checker
+
+    def scan_directory(self, directory, jobs=1):
+        """Scan all supported files in a directory, optionally across worker processes"""
+        self.scan_files(self.iter_files(directory), jobs=jobs)
+
+    def scan_diff(self, base, head='HEAD', whole_file=False, jobs=1):
+        """Scan only the files changed since the merge base of base and head
+
+        Unless whole_file is set, findings outside the changed hunks are dropped.
+        """
+        changes = {
+            str(Path(path)): lines for path, lines in changed_lines(base, head).items()
+            if self.is_supported(path) and os.path.isfile(path)
         }
+        print(f"Diff scope: {len(changes)} changed files since merge base of {base} and {head}")
 
-        return {
-            'findings': self.findings,
-            'summary': summary,
-            'scan_info': {
-                'total_files_scanned': len(set(f['file'] for f in self.findings)),
-                'patterns_used': list(self.patterns.keys())
+        if not whole_file:
+            self.line_filter = changes
+        if self.baseline is not None:
+            self.baseline.partial = True
+        try:
+            self.scan_files([Path(path) for path in sorted(changes)], jobs=jobs)
+        finally:
+            self.line_filter = None
+
+    def scan_files(self, files, jobs=1):
+        """Scan an ordered collection of files, optionally across worker processes"""
+        if jobs <= 1:
+            for file_path in files:
+                self.scan_file(file_path)
+            return
+
+        files = list(files)
+        cached = [self.cache.lookup(file_path) if self.cache else None for file_path in files]
+        pending = [file_path for file_path, record in zip(files, cached) if record is None]
+
+        chunksize = max(1, min(64, len(pending) // (jobs * 4)))
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(self,)) as pool:
+            # map() hands results back in submission order, so the merged
+            # findings match a serial run regardless of worker count
+            results = pool.map(_scan_in_worker, pending, chunksize=chunksize)
+            for file_path, record in zip(files, cached):
+                if record is None:
+                    record = next(results)
+                    if self.cache:
+                        self._cache_store(file_path, record)
+                self._record(file_path, record)
+
+    def scan_info(self):
+        """Run metadata reported next to the findings"""
+        scan_info = {
+            'total_files_scanned': len(self.files_with_findings),
+            'patterns_used': list(self.patterns.keys()),
+            'triage': self.triage,
+            'diagnostics': self.diagnostics
+        }
+        if self.profiling:
+            scan_info['profile'] = self.profile_report()
+        if self.baseline is not None:
+            scan_info['baseline'] = {
+                'path': self.baseline_path,
+                'baselined': self.baseline.matched,
+                'resolved': self.baseline.resolved()
             }
+        return scan_info
+
+    def generate_report(self):
+        """Generate a summary report of findings
+
+        With a streaming sink this reads every finding back into memory; use
+        write_report to produce the results file without doing so.
+        """
+        return {
+            'findings': list(self.iter_findings()),
+            'summary': dict(self.summary),
+            'scan_info': self.scan_info()
         }
 
-def main():
+    def write_report(self, path):
+        """Write the results JSON, streaming findings from the sink one at a time"""
+        with open(path, 'w') as f:
+            write_report(f, self.iter_findings(), dict(self.summary), self.scan_info())
+        return dict(self.summary)
+
+    def write_sarif(self, path):
+        """Write findings as a SARIF 2.1.0 log, streaming them from the sink"""
+        with open(path, 'w', encoding='utf-8') as f:
+            write_sarif(f, self.patterns, self.iter_findings(context=False), self.diagnostics)
+
+
+# Per-process checker used by scan_directory's worker pool
+_worker_checker = None
+
+
+def _init_worker(checker):
+    """Install the parent's checker configuration in a pool worker"""
+    global _worker_checker
+    _worker_checker = checker
+
+
+def _scan_in_worker(file_path):
+    """Scan one file in a pool worker and hand its scan record back"""
+    return _worker_checker.scan_path(file_path)
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description='Custom security pattern analysis')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='number of worker processes (0 = one per CPU, default: 1)')
+    parser.add_argument('--cache', nargs='?', const=DEFAULT_CACHE_PATH, metavar='PATH',
+                        help=f'reuse findings for unchanged files across runs (default path: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--diff', metavar='BASE',
+                        help='only scan files changed between the merge base of BASE and HEAD, '
+                             'reporting findings on changed lines')
+    parser.add_argument('--diff-whole-file', action='store_true',
+                        help='with --diff, keep every finding in the changed files')
+    parser.add_argument('--no-securityignore', action='store_true',
+                        help=f'do not skip paths listed in {DEFAULT_IGNORE_FILE}')
+    parser.add_argument('--gitignore', action='store_true',
+                        help='also skip paths ignored by the top-level .gitignore')
+    parser.add_argument('--walker', choices=WALKERS, default=DEFAULT_WALKER,
+                        help="how to list files: 'scandir' and 'walk' read the file system, 'git' lists "
+                             "tracked files from the git index (default: %(default)s)")
+    parser.add_argument('--mmap-threshold', type=float, default=DEFAULT_MMAP_THRESHOLD / (1024 * 1024), metavar='MB',
+                        help='scan files of at least this size as bytes over mmap (default: %(default)s)')
+    parser.add_argument('--max-file-size', type=float, default=DEFAULT_MAX_FILE_SIZE / (1024 * 1024), metavar='MB',
+                        help='skip files larger than this; files past --mmap-threshold are scanned over mmap '
+                             'in flat memory (0 disables, default: %(default)s)')
+    parser.add_argument('--rule-timeout', type=float, default=DEFAULT_RULE_TIMEOUT, metavar='SECONDS',
+                        help='time budget per rule per file, including the fallback to line-bounded matching; '
+                             'a file takes at most one budget per pass plus one per rule (0 disables, '
+                             'default: %(default)s)')
+    parser.add_argument('--findings-jsonl', metavar='PATH',
+                        help='stream findings to a JSON Lines file as they are found, '
+                             'instead of holding them in memory until the end')
+    parser.add_argument('--sarif', nargs='?', const=DEFAULT_SARIF_PATH, metavar='PATH',
+                        help=f'also write findings as SARIF 2.1.0 (default path: {DEFAULT_SARIF_PATH})')
+    parser.add_argument('--baseline', nargs='?', const=DEFAULT_BASELINE_PATH, metavar='PATH',
+                        help='report only findings missing from this baseline and list baselined findings '
+                             f'that are gone as resolved (default path: {DEFAULT_BASELINE_PATH})')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='with --baseline, report every finding and rewrite the baseline from this scan')
+    parser.add_argument('--watch', action='store_true',
+                        help='keep running and refresh the results file whenever a scanned file changes')
+    parser.add_argument('--watch-backend', choices=WATCH_BACKENDS, default='auto',
+                        help="how --watch notices changes: 'inotify', 'poll', or 'auto' to use inotify "
+                             "when available (default: %(default)s)")
+    parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL, metavar='SECONDS',
+                        help='seconds between polls when --watch is polling (default: %(default)s)')
+    parser.add_argument('--profile', action='store_true',
+                        help='record per-rule and per-file timings under scan_info.profile')
+    parser.add_argument('--profile-top', type=int, default=DEFAULT_PROFILE_TOP, metavar='N',
+                        help='number of slowest files and rules to list (default: %(default)s)')
+    args = parser.parse_args(argv)
+    if args.jobs <= 0:
+        args.jobs = os.cpu_count() or 1
+    return args
+
+
+def main(argv=None):
     """Main execution function"""
+    args = parse_args(argv)
     print("Starting custom security analysis...")
 
-    checker = SecurityChecker()
-    checker.scan_directory('.')
-    report = checker.generate_report()
+    try:
+        registry = RuleRegistry.from_config()
+    except ValueError as e:
+        print(f"❌ {e}")
+        return -1
+
+    checker = SecurityChecker(registry)
+    checker.mmap_threshold = int(args.mmap_threshold * 1024 * 1024)
+    checker.max_file_size = int(args.max_file_size * 1024 * 1024)
+    checker.rule_timeout = args.rule_timeout
+    checker.profiling = args.profile
+    checker.profile_top = args.profile_top
+    ignore_files = [] if args.no_securityignore else [DEFAULT_IGNORE_FILE]
+    if args.gitignore:
+        ignore_files.append('.gitignore')
+    checker.ignore_rules = IgnoreMatcher.from_files(ignore_files)
+    checker.walker = args.walker
+    if args.cache:
+        checker.cache = ScanCache(args.cache, checker.rule_fingerprint())
+    if args.watch:
+        if args.diff or args.baseline or args.update_baseline or args.findings_jsonl or args.sarif or args.profile:
+            print("❌ --watch cannot be combined with --diff, --baseline, --findings-jsonl, --sarif or --profile")
+            return -1
+        try:
+            return watch(checker, '.', 'custom-security-results.json', args.watch_backend, args.poll_interval)
+        finally:
+            if checker.cache:
+                checker.cache.save()
+    if args.findings_jsonl:
+        checker.sink = JsonLinesSink(args.findings_jsonl)
+    if args.update_baseline and not args.baseline:
+        args.baseline = DEFAULT_BASELINE_PATH
+    if args.update_baseline and args.diff:
+        print("❌ --update-baseline needs a full scan, not --diff")
+        return -1
+    if args.baseline:
+        try:
+            checker.baseline = Baseline() if args.update_baseline else Baseline.load(args.baseline)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return -1
+        checker.baseline_path = args.baseline
+
+    try:
+        if args.diff:
+            checker.scan_diff(args.diff, whole_file=args.diff_whole_file, jobs=args.jobs)
+        else:
+            checker.scan_directory('.', jobs=args.jobs)
+    finally:
+        if checker.sink:
+            checker.sink.close()
+
+    if checker.cache:
+        checker.cache.save()
+        print(f"Scan cache: {checker.cache.hits} files reused, {checker.cache.misses} rescanned")
+
+    if checker.baseline is not None:
+        if args.update_baseline:
+            count = checker.baseline.save(args.baseline)
+            print(f"Baseline {args.baseline} rewritten with {count} findings")
+        else:
+            print(f"Baseline: {checker.baseline.matched} known findings suppressed, "
+                  f"{len(checker.baseline.resolved())} resolved")
 
     # Write results to JSON file
-    with open('custom-security-results.json', 'w') as f:
-        json.dump(report, f, indent=2)
+    summary = checker.write_report('custom-security-results.json')
+    if args.sarif:
+        checker.write_sarif(args.sarif)
+        print(f"SARIF log saved to {args.sarif}")
 
     # Print summary
-    summary = report['summary']
     print("Custom security scan completed!")
     print(f"Total findings: {summary['total']}")
     print(f"Critical: {summary['critical']}, High: {summary['high']}, Medium: {summary['medium']}, Low: {summary['low']}")
@@ -0,0 +1,231 @@
+"""
+Tool Results
+Streams Semgrep, Bandit and custom scanner result files into the scanner's finding schema
+"""
+
+import json
+import re
+
+from findings import report_finding
+
+# Characters read per refill; items are decoded one at a time from this window
+CHUNK_SIZE = 1024 * 1024
+
+WHITESPACE_RE = re.compile(r'[ \t\n\r]*')
+# What is left of a window that ends partway through a number
+NUMBER_TAIL_RE = re.compile(r'[0-9.eE+-]*\Z')
+CWE_RE = re.compile(r'CWE-(\d+)', re.IGNORECASE)
+
+# Semgrep reports ERROR/WARNING/INFO; newer versions also use the scanner's own levels
+SEMGREP_SEVERITIES = {
+    'ERROR': 'HIGH',
+    'WARNING': 'MEDIUM',
+    'INFO': 'LOW',
+    'CRITICAL': 'CRITICAL',
+    'HIGH': 'HIGH',
+    'MEDIUM': 'MEDIUM',
+    'LOW': 'LOW'
+}
+
+BANDIT_LEVELS = ('LOW', 'MEDIUM', 'HIGH')
+
+
+class JsonStream:
+    """Incremental reader over one JSON document, holding only a window of the text
+
+    Values are decoded with json's raw_decode as soon as they are complete in
+    the window; containers can instead be stepped through item by item.
+    """
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """Read another chunk, dropping the consumed part of the window; False at end of file"""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character without consuming it, or '' at end of file"""
+        while True:
+            self.pos = WHITESPACE_RE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, chars):
+        """Consume the next token character, which must be one of ``chars``"""
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r} but found {char or 'end of file'!r}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decode and consume the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number cut off by the end of the window may continue in the next chunk
+            if self.buffer[self.pos] in '-0123456789' and NUMBER_TAIL_RE.match(self.buffer, end) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def items(self):
+        """Yield each value of the array starting here, decoding one item at a time"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(',]') == ']':
+                return
+
+    def members(self):
+        """Yield each key of the object starting here; the caller consumes each value"""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            yield key
+            if self.expect(',}') == '}':
+                return
+
+    def skip(self):
+        """Consume the next value without keeping it, container by container"""
+        char = self.peek()
+        if char == '[':
+            for _ in self.items():
+                pass
+        elif char == '{':
+            for _ in self.members():
+                self.skip()
+        else:
+            self.value()
+
+
+def iter_array(f, key, chunk_size=CHUNK_SIZE):
+    """Yield the items of the array under top-level ``key`` of a JSON object, one at a time"""
+    stream = JsonStream(f, chunk_size)
+    for name in stream.members():
+        if name == key and stream.peek() == '[':
+            yield from stream.items()
+            return
+        stream.skip()
+
+
+def first_cwe(value):
+    """CWE-<n> from a CWE string, a list of them, or a numeric ID"""
+    if isinstance(value, int):
+        return f'CWE-{value}'
+    if isinstance(value, dict):
+        return first_cwe(value.get('id'))
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            cwe = first_cwe(item)
+            if cwe:
+                return cwe
+        return None
+    if isinstance(value, str):
+        found = CWE_RE.search(value)
+        return f'CWE-{found.group(1)}' if found else None
+    return None
+
+
+def parse_custom(item):
+    """Finding from custom-security-results.json, already in the report schema"""
+    return report_finding(
+        item.get('file', 'unknown'), item.get('line', 0), item.get('rule', 'security-issue'),
+        item.get('severity', 'MEDIUM').upper(), item.get('cwe'), item.get('match', ''),
+        item.get('context', ''), item.get('description', 'Security vulnerability detected')
+    )
+
+
+def parse_semgrep(item):
+    """Finding from one entry of Semgrep's JSON ``results``"""
+    extra = item.get('extra', {})
+    metadata = extra.get('metadata', {})
+    lines = extra.get('lines', '')
+    return report_finding(
+        item.get('path', ''), item.get('start', {}).get('line', 0), item.get('check_id', 'semgrep-rule'),
+        SEMGREP_SEVERITIES.get(str(extra.get('severity', 'WARNING')).upper(), 'MEDIUM'),
+        first_cwe(metadata.get('cwe')), lines.strip(), lines,
+        extra.get('message', 'Semgrep security finding')
+    )
+
+
+def parse_bandit(item):
+    """Finding from one entry of Bandit's JSON ``results``"""
+    line = item.get('line_number', 0)
+    code = item.get('code', '')
+    # Bandit's code excerpt prefixes each line with its number
+    match = ''
+    for code_line in code.splitlines():
+        number, _, text = code_line.partition(' ')
+        if number == str(line):
+            match = text.strip()
+            break
+    return report_finding(
+        item.get('filename', ''), line, f"bandit.{item.get('test_id', 'B000')}.{item.get('test_name', 'issue')}",
+        item.get('issue_severity', 'MEDIUM').upper(), first_cwe(item.get('issue_cwe')), match, code,
+        item.get('issue_text', 'Bandit security finding')
+    )
+
+
+def bandit_filter(settings):
+    """Predicate keeping Bandit findings at or above the configured severity and confidence"""
+    def level(value):
+        # Levels Bandit may add later (e.g. UNDEFINED) are never filtered out
+        value = str(value).upper()
+        return BANDIT_LEVELS.index(value) if value in BANDIT_LEVELS else len(BANDIT_LEVELS)
+
+    min_severity = level(settings.get('severity', 'low'))
+    min_confidence = level(settings.get('confidence', 'low'))
+
+    def keep(item):
+        return (level(item.get('issue_severity', 'MEDIUM')) >= min_severity
+                and level(item.get('issue_confidence', 'MEDIUM')) >= min_confidence)
+    return keep
+
+
+# tool: (default result file, top-level array key, parser)
+TOOLS = {
+    'custom': ('custom-security-results.json', 'findings', parse_custom),
+    'semgrep': ('semgrep-results.json', 'results', parse_semgrep),
+    'bandit': ('bandit-results.json', 'results', parse_bandit)
+}
+
+
+def iter_tool_findings(tool, path=None, keep=None):
+    """Stream one tool's result file as report findings
+
+    ``keep``, if given, is called with each raw result before it is parsed.
+    """
+    default_path, key, parse = TOOLS[tool]
+    with open(path or default_path, 'r', encoding='utf-8') as f:
+        for item in iter_array(f, key):
+            if keep is None or keep(item):
+                yield parse(item)
@@ -0,0 +1,324 @@
+"""
+Watch Mode
+Keeps each file's findings in memory and rescans only the files that change
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import time
+from pathlib import Path
+
+from findings_sink import encode_finding, new_summary, write_encoded_report
+
+WATCH_BACKENDS = ('auto', 'inotify', 'poll')
+DEFAULT_POLL_INTERVAL = 1.0
+
+# Events arriving this soon after the first one are handled in the same
+# refresh, so an editor's write-rename-chmod burst costs one rescan
+SETTLE_TIME = 0.02
+
+# inotify(7) event bits
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR | IN_DONT_FOLLOW
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    """Changed paths from Linux inotify, with one watch per scanned directory"""
+
+    name = 'inotify'
+
+    def __init__(self, checker, directory):
+        self.checker = checker
+        self.directory = directory
+        libc_name = ctypes.util.find_library('c')
+        self.libc = ctypes.CDLL(libc_name, use_errno=True) if libc_name else None
+        if self.libc is None or not hasattr(self.libc, 'inotify_init1'):
+            raise OSError('inotify is not available on this platform')
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.dirs = {}
+        try:
+            self.watch_tree(directory)
+        except OSError:
+            self.close()
+            raise
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def _skip_dir(self, path, name):
+        if name in self.checker.exclude_directories:
+            return True
+        ignore_rules = self.checker.ignore_rules
+        return bool(ignore_rules) and ignore_rules.is_ignored(path, is_dir=True)
+
+    def watch_tree(self, root):
+        """Watch ``root`` and every directory below it that the scanner would enter"""
+        stack = [root]
+        while stack:
+            path = stack.pop()
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                # The directory may be gone already; running out of watches is fatal
+                if error in (errno.ENOENT, errno.ENOTDIR):
+                    continue
+                raise OSError(error, f'inotify_add_watch failed for {path}: {os.strerror(error)}')
+            self.dirs[wd] = path
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            child = str(Path(path) / entry.name)
+                            if not self._skip_dir(child, entry.name):
+                                stack.append(child)
+            except OSError:
+                continue
+
+    def forget(self, path):
+        """Drop the watches for a directory moved away and everything below it"""
+        prefix = path + os.sep
+        for wd, watched in list(self.dirs.items()):
+            if watched == path or watched.startswith(prefix):
+                self.libc.inotify_rm_watch(self.fd, wd)
+                del self.dirs[wd]
+
+    def _events(self):
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+                offset += length
+                yield wd, mask, name
+
+    def changes(self, timeout=None):
+        """Block until something changes; returns (paths, rescan_all)"""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return set(), False
+
+        changed = set()
+        rescan_all = False
+        deadline = time.monotonic() + SETTLE_TIME
+        while True:
+            for wd, mask, name in self._events():
+                if mask & IN_Q_OVERFLOW:
+                    # The kernel dropped events, so nothing short of a full rescan is reliable
+                    rescan_all = True
+                    continue
+                if mask & IN_IGNORED:
+                    self.dirs.pop(wd, None)
+                    continue
+                parent = self.dirs.get(wd)
+                if parent is None or not name:
+                    continue
+                path = str(Path(parent) / name)
+
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO) and not self._skip_dir(path, name):
+                        self.watch_tree(path)
+                        changed.update(str(file_path) for file_path in self.checker.iter_files(path))
+                    elif mask & IN_MOVED_FROM:
+                        self.forget(path)
+                        changed.add(path)
+                    elif mask & IN_DELETE:
+                        changed.add(path)
+                else:
+                    changed.add(path)
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([self.fd], [], [], remaining)[0]:
+                return changed, rescan_all
+
+
+class PollingWatcher:
+    """Changed paths found by re-walking the tree and comparing size and mtime"""
+
+    name = 'polling'
+
+    def __init__(self, checker, directory, interval=DEFAULT_POLL_INTERVAL):
+        self.checker = checker
+        self.directory = directory
+        self.interval = interval
+        self.snapshot = self.take_snapshot()
+        self.next_poll = time.monotonic() + interval
+
+    def close(self):
+        pass
+
+    def take_snapshot(self):
+        snapshot = {}
+        for file_path in self.checker.iter_files(self.directory):
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            snapshot[str(file_path)] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def changes(self, timeout=None):
+        """Wait for the next poll and return (paths, rescan_all)"""
+        delay = self.next_poll - time.monotonic()
+        if timeout is not None and timeout < delay:
+            time.sleep(max(timeout, 0))
+            return set(), False
+        if delay > 0:
+            time.sleep(delay)
+        self.next_poll = time.monotonic() + self.interval
+
+        snapshot = self.take_snapshot()
+        changed = {path for path, stat in snapshot.items() if self.snapshot.get(path) != stat}
+        changed.update(path for path in self.snapshot if path not in snapshot)
+        self.snapshot = snapshot
+        return changed, False
+
+
+def open_watcher(checker, directory, backend='auto', interval=DEFAULT_POLL_INTERVAL):
+    """inotify watcher where available, falling back to polling for 'auto'"""
+    if backend in ('auto', 'inotify'):
+        try:
+            return InotifyWatcher(checker, directory)
+        except OSError as e:
+            if backend == 'inotify':
+                raise
+            print(f"inotify unavailable ({e}), polling every {interval:g}s instead")
+    return PollingWatcher(checker, directory, interval)
+
+
+class WatchSession:
+    """Encoded findings, summary and triage for every scanned file, kept between changes
+
+    Each file is scanned by its own scratch checker, so replacing a file's
+    entry is all it takes to update the run. Findings are stored already
+    JSON-encoded, so a refresh only re-encodes the files that changed.
+    """
+
+    def __init__(self, checker, directory, output_path):
+        self.checker = checker
+        self.directory = directory
+        self.output_path = output_path
+        self.reports = {}
+
+    def scan(self, file_path):
+        scratch = self.checker.scratch()
+        scratch.scan_file(file_path)
+        self.reports[str(file_path)] = {
+            'findings': [encode_finding(finding) for finding in scratch.iter_findings()],
+            'summary': scratch.summary,
+            'triage': scratch.triage,
+            'diagnostics': scratch.diagnostics
+        }
+
+    def full_scan(self):
+        self.reports = {}
+        for file_path in self.checker.iter_files(self.directory):
+            self.scan(file_path)
+
+    def apply(self, changed):
+        """Rescan changed files and forget deleted ones; new files go after the rest
+
+        Returns how many entries were rescanned or dropped, which is zero when
+        only files the scanner skips (such as the report itself) changed.
+        """
+        updated = 0
+        for path in sorted(changed):
+            if os.path.isfile(path) and self.checker.is_supported(path):
+                self.scan(path)
+                updated += 1
+                continue
+            # A removed directory takes all of its files with it
+            prefix = path + os.sep
+            stale = [known for known in self.reports if known == path or known.startswith(prefix)]
+            for known in stale:
+                del self.reports[known]
+            updated += len(stale)
+        return updated
+
+    def write(self):
+        """Rewrite the results file from the in-memory entries; returns the summary"""
+        summary = new_summary()
+        triage = {'normal': 0, 'restricted': [], 'skipped': []}
+        diagnostics = []
+        files_with_findings = 0
+        for report in self.reports.values():
+            for key, count in report['summary'].items():
+                summary[key] += count
+            triage['normal'] += report['triage']['normal']
+            triage['restricted'].extend(report['triage']['restricted'])
+            triage['skipped'].extend(report['triage']['skipped'])
+            diagnostics.extend(report['diagnostics'])
+            files_with_findings += bool(report['findings'])
+
+        scan_info = {
+            'total_files_scanned': files_with_findings,
+            'patterns_used': list(self.checker.patterns.keys()),
+            'triage': triage,
+            'diagnostics': diagnostics
+        }
+        findings = (finding for report in self.reports.values() for finding in report['findings'])
+        # Written aside and renamed, so readers never see a half-written report
+        tmp_path = f'{self.output_path}.tmp'
+        with open(tmp_path, 'w') as f:
+            write_encoded_report(f, findings, summary, scan_info)
+        os.replace(tmp_path, self.output_path)
+        return summary
+
+    def run(self, watcher):
+        """Refresh the report after every batch of changes until interrupted"""
+        print(f"Watching {self.directory} for changes ({watcher.name}), press Ctrl+C to stop")
+        while True:
+            changed, rescan_all = watcher.changes()
+            if not changed and not rescan_all:
+                continue
+            start = time.perf_counter()
+            if rescan_all:
+                self.full_scan()
+            elif not self.apply(changed):
+                continue
+            summary = self.write()
+            elapsed = (time.perf_counter() - start) * 1000
+            what = 'full rescan' if rescan_all else f"{len(changed)} changed"
+            print(f"[{time.strftime('%H:%M:%S')}] {what}, report refreshed in {elapsed:.1f} ms: "
+                  f"{summary['total']} findings")
+
+
+def watch(checker, directory, output_path, backend='auto', interval=DEFAULT_POLL_INTERVAL):
+    """Scan once, then keep output_path current as files change; returns the last total"""
+    # Watch before the first scan, so edits made while it runs are not missed
+    watcher = open_watcher(checker, directory, backend, interval)
+    session = WatchSession(checker, directory, output_path)
+    start = time.perf_counter()
+    session.full_scan()
+    summary = session.write()
+    print(f"Initial scan: {len(session.reports)} files, {summary['total']} findings "
+          f"in {time.perf_counter() - start:.2f}s")
+    try:
+        session.run(watcher)
+    except KeyboardInterrupt:
+        print("Stopped watching")
+    finally:
+        watcher.close()
+    return session.write()['total']
@@ -0,0 +1,534 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the custom security scanner
+
+Generates a deterministic synthetic corpus, times scan_file, scan_directory and
+generate_report on it, and compares the results against a stored baseline so
+that performance regressions fail loudly.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / '.github' / 'scripts'))
+
+DEFAULT_BASELINE_PATH = Path(__file__).resolve().parent / 'benchmark_baseline.json'
+
+# Bump when the corpus generator changes, so old baselines are not compared
+CORPUS_VERSION = 2
+
+# Allowed slowdown before a benchmark counts as a regression (0.25 = 25%)
+DEFAULT_TOLERANCE = 0.25
+# Per-rule timings are small and noisy, so they get a wider margin
+DEFAULT_RULE_TOLERANCE = 0.5
+# A rule's cost must also grow by at least this many ms/MB to count, so
+# cheap rules (a few ms/MB, hundredths of a second in total) never flap
+DEFAULT_RULE_FLOOR_MS = 10.0
+
+# Clean filler lines per language, roughly shaped like real code
+CLEAN_LINES = {
+    '.py': [
+        'def handle_{n}(request):\n',
+        '    result = compute_total(items, rate={n})\n',
+        '    if not result:\n',
+        '        return None\n',
+        '    logger.info("processed %s items", len(items))\n',
+        'import os\n',
+        '# helper for batch {n}\n',
+    ],
+    '.js': [
+        'function handle{n}(req, res) {{\n',
+        '  const total = items.reduce((a, b) => a + b, {n});\n',
+        '  return res.json({{ total }});\n',
+        '}}\n',
+        '// render step {n}\n',
+        'export default handle{n};\n',
+    ],
+    '.ts': [
+        'export function handle{n}(input: string): number {{\n',
+        '  const parsed: number = parseInt(input, 10) + {n};\n',
+        '  return parsed;\n',
+        '}}\n',
+        'interface Item{n} {{ id: number; name: string }}\n',
+    ],
+    '.java': [
+        'public class Handler{n} {{\n',
+        '    private final int limit = {n};\n',
+        '    public int total(List<Integer> items) {{ return items.size(); }}\n',
+        '}}\n',
+    ],
+    '.go': [
+        'func handle{n}(w http.ResponseWriter, r *http.Request) {{\n',
+        '\ttotal := len(items) + {n}\n',
+        '\tfmt.Fprintf(w, "%d", total)\n',
+        '}}\n',
+    ],
+    '.php': [
+        '<?php function handle_{n}($items) {{\n',
+        '    return count($items) + {n};\n',
+        '}}\n',
+    ],
+    '.rb': [
+        'def handle_{n}(items)\n',
+        '  items.sum + {n}\n',
+        'end\n',
+    ],
+    '.c': [
+        'static int handle_{n}(const int *items, size_t len) {{\n',
+        '    return (int)len + {n};\n',
+        '}}\n',
+    ],
+}
+
+# Lines that trip the scanner's rules, across every rule
+HIT_LINES = [
+    'password = "benchmark-value-{n}"\n',
+    'api_key: "abcdefghij{n}"\n',
+    'query = "SELECT * FROM users WHERE id=" + user_id + "\'"\n',
+    'element.innerHTML = "<b>" + name;\n',
+    'fetch("http://example.com/api/{n}")\n',
+    'digest = md5(payload)\n',
+    'exec("rm -rf $TARGET")\n',
+    'open("../../etc/passwd")\n',
+    'seed = Math.random()\n',
+]
+
+# An ignore marker makes the scanner skip the whole file, so only a few
+# files carry one
+IGNORED_LINE = 'token = "placeholder{n}value"  # SECURITY_TEST_IGNORE: benchmark fixture\n'
+IGNORED_FILE_RATIO = 0.03
+
+
+def generate_corpus(root, files=600, seed=1337):
+    """Write a deterministic corpus under root and return its size and digest
+
+    The corpus mixes languages and file sizes (a long tail up to a few MB),
+    spreads files over trees up to ten directories deep, keeps the hit density
+    around two findings per hundred lines, and adds a minified bundle, a file
+    with very long lines and an excluded node_modules directory.
+    """
+    rng = random.Random(seed)
+    digest = hashlib.sha256()
+    total_bytes = 0
+    written = []
+    extensions = sorted(CLEAN_LINES)
+
+    def write(relative_path, text):
+        nonlocal total_bytes
+        path = Path(root) / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = text.encode('utf-8')
+        path.write_bytes(data)
+        digest.update(relative_path.encode('utf-8') + b'\0' + data)
+        total_bytes += len(data)
+        written.append(relative_path)
+
+    for i in range(files):
+        depth = rng.choice([0, 1, 1, 2, 2, 3, 4, 6, 10])
+        parts = [f'pkg{rng.randint(0, 5)}' for _ in range(depth)]
+        extension = rng.choice(extensions)
+        # Log-normal line counts give many small files and a few large ones
+        line_count = min(60000, max(3, int(rng.lognormvariate(4.5, 1.4))))
+        clean = CLEAN_LINES[extension]
+
+        lines = []
+        for _ in range(line_count):
+            roll = rng.random()
+            if roll < 0.02:
+                template = rng.choice(HIT_LINES)
+            else:
+                template = rng.choice(clean)
+            lines.append(template.format(n=rng.randint(0, 99999)))
+        if rng.random() < IGNORED_FILE_RATIO:
+            lines.insert(rng.randrange(len(lines)), IGNORED_LINE.format(n=i))
+        write('/'.join(parts + [f'file{i}{extension}']), ''.join(lines))
+
+    # One minified bundle and one file with a handful of very long lines
+    bundle = ''.join(
+        f'var a{n}=b("http://cdn.example.com/{n}")+c[{n}];' for n in range(2000)
+    )
+    write('static/bundle.min.js', bundle + '\n')
+    long_lines = ''.join(
+        'const data = "' + 'x' * rng.randint(3000, 9000) + '";\n' for _ in range(20)
+    )
+    write('static/fixtures.js', long_lines)
+
+    # Excluded directories must not be walked at all
+    write('node_modules/dep/index.js', 'password = "benchmark-value-0"\n' * 500)
+
+    return {
+        'files': len(written),
+        'bytes': total_bytes,
+        'sha256': digest.hexdigest(),
+        'version': CORPUS_VERSION,
+        'seed': seed
+    }
+
+
+def generate_tree(root, files=20000, seed=1337):
+    """Write a wide tree of empty files for the enumeration benchmarks
+
+    About half the names have a scanned extension, the rest are docs, data
+    and assets; a node_modules directory holds files that must be pruned.
+    The tree is added to a git index so the git walker can be timed too.
+    """
+    rng = random.Random(seed)
+    extensions = sorted(CLEAN_LINES) + ['.md', '.json', '.txt', '.png', '.yml', '.lock', '.min.css']
+    for i in range(files):
+        depth = rng.choice([1, 2, 2, 3, 3, 4, 5, 6])
+        directory = Path(root, *[f'dir{rng.randint(0, 7)}' for _ in range(depth)])
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f'item{i}{rng.choice(extensions)}').touch()
+    excluded = Path(root, 'node_modules', 'dep')
+    excluded.mkdir(parents=True)
+    for i in range(files // 4):
+        (excluded / f'module{i}.js').touch()
+
+    tracked = False
+    if shutil.which('git'):
+        git = ['git', '-C', str(root), '-c', 'core.autocrlf=false']
+        tracked = (
+            subprocess.run(git + ['init', '-q'], capture_output=True).returncode == 0
+            and subprocess.run(git + ['add', '-A'], capture_output=True).returncode == 0
+        )
+    return {'files': files, 'excluded': files // 4, 'seed': seed, 'git': tracked}
+
+
+def calibrate(rounds=5):
+    """Time a fixed regex and interpreter workload to normalize across machines"""
+    text = 'lorem ipsum dolor sit amet password = "value" ' * 2000
+    regex = re.compile(r'(?i)(password|secret)\s*=\s*"([^"]{4,})"')
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(10):
+            sum(1 for _ in regex.finditer(text))
+            sum(len(word) for word in text.split())
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process and its reaped children, or None"""
+    if resource is None:
+        return None
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    )
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_benchmark(name, corpus, jobs):
+    """Run one benchmark once and return its timing, in a fresh process"""
+    from security_scanner import SecurityChecker
+
+    # Per-file progress lines would time the terminal rather than the scanner
+    sys.stdout = open(os.devnull, 'w')
+
+    checker = SecurityChecker()
+    files = list(checker.iter_files(corpus))
+    scanned_bytes = sum(os.path.getsize(path) for path in files)
+
+    if name == 'scan_file':
+        started = time.perf_counter()
+        for path in files:
+            checker.scan_file(path)
+        elapsed = time.perf_counter() - started
+    elif name == 'scan_directory':
+        started = time.perf_counter()
+        checker.scan_directory(corpus, jobs=jobs)
+        elapsed = time.perf_counter() - started
+    elif name == 'generate_report':
+        checker.scan_directory(corpus, jobs=jobs)
+        started = time.perf_counter()
+        json.dumps(checker.generate_report(), indent=2)
+        elapsed = time.perf_counter() - started
+    else:
+        raise ValueError(f"Unknown benchmark: {name}")
+
+    return {
+        'seconds': elapsed,
+        'files': len(files),
+        'bytes': scanned_bytes,
+        'findings': len(checker.findings),
+        'peak_rss_bytes': peak_rss_bytes()
+    }
+
+
+def run_enumeration(walker, tree):
+    """Time one file enumeration backend over the tree, in a fresh process"""
+    from security_scanner import SecurityChecker
+
+    sys.stdout = open(os.devnull, 'w')
+    checker = SecurityChecker()
+    started = time.perf_counter()
+    files = sum(1 for _ in checker.iter_files(tree, walker))
+    return {
+        'seconds': time.perf_counter() - started,
+        'files': files,
+        'bytes': 0,
+        'findings': 0,
+        'peak_rss_bytes': peak_rss_bytes()
+    }
+
+
+def run_rule_profile(corpus):
+    """Per-rule cost from the scanner's own --profile instrumentation"""
+    from security_scanner import SecurityChecker
+
+    sys.stdout = open(os.devnull, 'w')
+
+    checker = SecurityChecker()
+    checker.profiling = True
+    checker.scan_directory(corpus)
+    rules = checker.profile_report()['rules']
+    return {
+        name: {
+            'seconds': totals['seconds'],
+            'seconds_per_mb': totals['seconds'] / max(totals['bytes'], 1) * 1e6,
+            'invocations': totals['invocations'],
+            'matches': totals['matches']
+        }
+        for name, totals in sorted(rules.items())
+    }
+
+
+def measure(corpus, tree, repeat=3, jobs=1, walkers=('walk', 'scandir', 'git')):
+    """Best-of-N timings for every benchmark, each run in its own process"""
+    benchmarks = [(name, run_benchmark, (name, corpus, jobs)) for name in ('scan_file', 'scan_directory', 'generate_report')]
+    # os.walk is the reference the faster enumeration backends are compared with
+    benchmarks += [(f'enumerate_{walker}', run_enumeration, (walker, tree)) for walker in walkers]
+
+    results = {}
+    for name, function, arguments in benchmarks:
+        runs = []
+        for _ in range(repeat):
+            # A fresh process per run keeps peak RSS and warm caches separate
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                runs.append(pool.submit(function, *arguments).result())
+        best = min(runs, key=lambda run: run['seconds'])
+        seconds = max(best['seconds'], 1e-9)
+        results[name] = {
+            'seconds': best['seconds'],
+            'files_per_sec': best['files'] / seconds,
+            'mb_per_sec': best['bytes'] / seconds / 1e6,
+            'findings': best['findings'],
+            'peak_rss_mb': (
+                max(run['peak_rss_bytes'] for run in runs) / 1e6
+                if best['peak_rss_bytes'] is not None else None
+            )
+        }
+
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        rules = pool.submit(run_rule_profile, corpus).result()
+    return results, rules
+
+
+def compare(current, baseline, tolerance, rule_tolerance, rule_floor_ms=DEFAULT_RULE_FLOOR_MS):
+    """Return (problems, slowdowns): lists of messages, both empty when current matches the baseline
+
+    ``problems`` are differences in results (findings, matches, corpus), which
+    hold on any machine. ``slowdowns`` are timing and memory thresholds; the
+    calibration only roughly normalizes those across machines.
+    """
+    if baseline['corpus'] != current['corpus']:
+        return [
+            "Corpus differs from the baseline (generator, seed or size changed); "
+            "re-run with --update-baseline"
+        ], []
+    if baseline['jobs'] != current['jobs']:
+        return [f"Baseline was recorded with --jobs {baseline['jobs']}, this run used --jobs {current['jobs']}"], []
+
+    # Scale baseline speed by how fast this machine runs the calibration workload
+    speed = baseline['calibration_seconds'] / current['calibration_seconds']
+    problems = []
+    slowdowns = []
+
+    for name, base in baseline['benchmarks'].items():
+        now = current['benchmarks'].get(name)
+        if now is None:
+            problems.append(f"{name}: missing from current run")
+            continue
+        if now['findings'] != base['findings']:
+            problems.append(f"{name}: {now['findings']} findings, baseline had {base['findings']}")
+
+        expected = base['files_per_sec'] * speed
+        if now['files_per_sec'] < expected * (1 - tolerance):
+            slowdowns.append(
+                f"{name}: {now['files_per_sec']:.1f} files/sec, expected at least "
+                f"{expected * (1 - tolerance):.1f} (baseline {expected:.1f} after calibration)"
+            )
+        if base.get('peak_rss_mb') and now.get('peak_rss_mb'):
+            if now['peak_rss_mb'] > base['peak_rss_mb'] * (1 + tolerance):
+                slowdowns.append(
+                    f"{name}: peak RSS {now['peak_rss_mb']:.1f} MB, baseline {base['peak_rss_mb']:.1f} MB"
+                )
+
+    for name, base in baseline['rules'].items():
+        now = current['rules'].get(name)
+        if now is None:
+            continue
+        if now['matches'] != base['matches']:
+            problems.append(f"rule {name}: {now['matches']} matches, baseline had {base['matches']}")
+        expected = base['seconds_per_mb'] / speed
+        allowed = max(expected * rule_tolerance, rule_floor_ms / 1000)
+        if now['seconds_per_mb'] > expected + allowed:
+            slowdowns.append(
+                f"rule {name}: {now['seconds_per_mb'] * 1000:.2f} ms/MB, "
+                f"baseline {expected * 1000:.2f} ms/MB after calibration"
+            )
+
+    return problems, slowdowns
+
+
+def print_results(current):
+    """Print a readable summary of one benchmark run"""
+    corpus = current['corpus']
+    print(f"Corpus: {corpus['files']} files, {corpus['bytes'] / 1e6:.1f} MB (sha256 {corpus['sha256'][:12]})")
+    tree = corpus['tree']
+    print(f"Tree: {tree['files']} files plus {tree['excluded']} in node_modules")
+    print(f"Calibration: {current['calibration_seconds'] * 1000:.1f} ms")
+    print()
+    print(f"{'benchmark':<18}{'seconds':>10}{'files/sec':>12}{'MB/sec':>10}{'findings':>10}{'peak RSS':>12}")
+    for name, result in current['benchmarks'].items():
+        rss = f"{result['peak_rss_mb']:.1f} MB" if result['peak_rss_mb'] is not None else 'n/a'
+        print(
+            f"{name:<18}{result['seconds']:>10.3f}{result['files_per_sec']:>12.1f}"
+            f"{result['mb_per_sec']:>10.2f}{result['findings']:>10}{rss:>12}"
+        )
+
+    reference = current['benchmarks'].get('enumerate_walk')
+    if reference:
+        speedups = [
+            f"{name[len('enumerate_'):]} {reference['seconds'] / max(result['seconds'], 1e-9):.1f}x"
+            for name, result in current['benchmarks'].items()
+            if name.startswith('enumerate_') and name != 'enumerate_walk'
+        ]
+        print(f"Enumeration speedup over os.walk: {', '.join(speedups)}")
+    print()
+    print(f"{'rule':<26}{'seconds':>10}{'ms/MB':>10}{'calls':>10}{'matches':>10}")
+    for name, rule in current['rules'].items():
+        print(
+            f"{name:<26}{rule['seconds']:>10.3f}{rule['seconds_per_mb'] * 1000:>10.2f}"
+            f"{rule['invocations']:>10}{rule['matches']:>10}"
+        )
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description='Benchmark the custom security scanner')
+    parser.add_argument('--files', type=int, default=600,
+                        help='number of generated source files (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=1337,
+                        help='corpus generator seed (default: %(default)s)')
+    parser.add_argument('--tree-files', type=int, default=20000,
+                        help='number of files in the enumeration benchmark tree (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs per benchmark, the fastest is kept (default: %(default)s)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='worker processes for scan_directory (default: %(default)s)')
+    parser.add_argument('--corpus', metavar='DIR',
+                        help='generate the corpus here and keep it, instead of a temp directory')
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE_PATH), metavar='PATH',
+                        help='baseline file to compare against (default: %(default)s)')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='write this run as the new baseline instead of comparing')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed slowdown as a fraction (default: %(default)s)')
+    parser.add_argument('--rule-tolerance', type=float, default=DEFAULT_RULE_TOLERANCE,
+                        help='allowed per-rule slowdown as a fraction (default: %(default)s)')
+    parser.add_argument('--rule-floor', type=float, default=DEFAULT_RULE_FLOOR_MS, metavar='MS_PER_MB',
+                        help='per-rule slowdowns smaller than this are ignored (default: %(default)s ms/MB)')
+    parser.add_argument('--strict', action='store_true',
+                        help='exit 1 on throughput, memory and per-rule slowdowns, not only on changed results; '
+                             'meant for runs on the machine that recorded the baseline')
+    parser.add_argument('--output', metavar='PATH',
+                        help='also write this run as JSON')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Generate the corpus, run the benchmarks and check for regressions"""
+    args = parse_args(argv)
+
+    corpus_dir = args.corpus or tempfile.mkdtemp(prefix='scanner-bench-')
+    tree_dir = tempfile.mkdtemp(prefix='scanner-bench-tree-')
+    try:
+        print(f"Generating corpus in {corpus_dir}...")
+        corpus = generate_corpus(corpus_dir, files=args.files, seed=args.seed)
+        corpus['tree'] = generate_tree(tree_dir, files=args.tree_files, seed=args.seed)
+        walkers = ('walk', 'scandir', 'git') if corpus['tree']['git'] else ('walk', 'scandir')
+        calibration = calibrate()
+        benchmarks, rules = measure(corpus_dir, tree_dir, repeat=args.repeat, jobs=args.jobs, walkers=walkers)
+    finally:
+        if not args.corpus:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+        shutil.rmtree(tree_dir, ignore_errors=True)
+
+    current = {
+        'corpus': corpus,
+        'jobs': args.jobs,
+        'calibration_seconds': calibration,
+        'benchmarks': benchmarks,
+        'rules': rules
+    }
+    print_results(current)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+            f.write('\n')
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    problems, slowdowns = compare(current, baseline, args.tolerance, args.rule_tolerance, args.rule_floor)
+    if problems:
+        print("\n❌ Results differ from baseline:")
+        for problem in problems:
+            print(f"   {problem}")
+    if slowdowns:
+        print(f"\n{'❌' if args.strict else '⚠️'} Performance regressions against baseline:")
+        for slowdown in slowdowns:
+            print(f"   {slowdown}")
+        if not args.strict:
+            print("   Timings are advisory on machines other than the baseline's; pass --strict to fail on them")
+    if problems or (slowdowns and args.strict):
+        return 1
+
+    print("\n✅ Results match baseline" if slowdowns else "\n✅ Within tolerance of baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Fake GitHub API Server
+A local stand-in for the parts of the REST API that create_security_issues.py
+uses, with optional latency and injected rate limits
+"""
+
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+OWNER = 'octo'
+REPO = 'scanned'
+
+
+class FakeGitHub:
+    """In-memory issues of one repository, served over HTTP on a free local port
+
+    ``latency`` delays every issue write so parallel requests overlap.
+    ``limit_every`` rejects every nth issue creation with a rate-limit response,
+    alternating a 429 without headers and a 403 with Retry-After.
+    """
+
+    def __init__(self, existing=0, latency=0.0, limit_every=0):
+        self.latency = latency
+        self.limit_every = limit_every
+        self.lock = threading.Lock()
+        self.issues = []
+        self.log = []
+        self.posts = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        for i in range(existing):
+            self.add_issue(f'Existing issue {i}', f"**Component**: `src/old{i}.py` (Line 1)\n", ['security'])
+        # The issues endpoint lists pull requests too, the index must skip them
+        self.add_issue('Security fixes', '', ['security'], pull_request=True)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(self))
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.repository = f'{OWNER}/{REPO}'
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def add_issue(self, title, body, labels, pull_request=False):
+        number = len(self.issues) + 1
+        issue = {
+            'number': number,
+            'title': title,
+            'body': body,
+            'state': 'open',
+            'labels': [{'name': label} for label in labels],
+            'html_url': f'https://github.example/{OWNER}/{REPO}/issues/{number}'
+        }
+        if pull_request:
+            issue['pull_request'] = {}
+        self.issues.append(issue)
+        return issue
+
+    def rate_limits(self):
+        """Number of injected rate-limit responses"""
+        return sum(1 for entry in self.log if entry[0] == 'LIMIT')
+
+
+def make_handler(github):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def reply(self, status, payload=None, headers=()):
+            data = b'' if payload is None else json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def read_json(self):
+            return json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            github.log.append(('GET', self.path))
+            if url.path == f'/repos/{OWNER}/{REPO}':
+                return self.reply(200, {'url': f'{github.url}{url.path}', 'full_name': github.repository, 'name': REPO})
+            if url.path != f'/repos/{OWNER}/{REPO}/issues':
+                return self.reply(404, {'message': 'Not Found'})
+
+            query = parse_qs(url.query)
+            per_page = int(query.get('per_page', ['30'])[0])
+            page = int(query.get('page', ['1'])[0])
+            with github.lock:
+                newest_first = list(reversed(github.issues))
+            chunk = newest_first[(page - 1) * per_page:page * per_page]
+            etag = '"' + hashlib.md5(json.dumps(chunk).encode('utf-8')).hexdigest() + '"'
+            if self.headers.get('If-None-Match') == etag:
+                return self.reply(304, None, [('ETag', etag)])
+
+            headers = [('ETag', etag)]
+            if page * per_page < len(newest_first):
+                next_url = f'{github.url}{url.path}?state=open&labels=security&per_page={per_page}&page={page + 1}'
+                headers.append(('Link', f'<{next_url}>; rel="next"'))
+            return self.reply(200, chunk, headers)
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            body = self.read_json()
+            github.log.append(('POST', url.path))
+            if url.path != f'/repos/{OWNER}/{REPO}/issues':
+                return self.reply(404, {'message': 'Not Found'})
+
+            with github.lock:
+                github.posts += 1
+                attempt = github.posts
+                github.in_flight += 1
+                github.max_in_flight = max(github.max_in_flight, github.in_flight)
+            time.sleep(github.latency)
+            with github.lock:
+                github.in_flight -= 1
+
+            if github.limit_every and attempt % github.limit_every == 0:
+                github.log.append(('LIMIT', attempt))
+                if attempt % (2 * github.limit_every) == 0:
+                    return self.reply(403, {'message': 'You have exceeded a secondary rate limit'}, [('Retry-After', '1')])
+                return self.reply(429, {'message': 'Too Many Requests'})
+
+            with github.lock:
+                issue = github.add_issue(body['title'], body['body'], body.get('labels', []))
+            return self.reply(201, issue)
+
+        def do_PATCH(self):
+            url = urlparse(self.path)
+            body = self.read_json()
+            github.log.append(('PATCH', url.path))
+            number = int(url.path.rsplit('/', 1)[1])
+            with github.lock:
+                issue = next((issue for issue in github.issues if issue['number'] == number), None)
+                if issue:
+                    issue.update(body)
+            if not issue:
+                return self.reply(404, {'message': 'Not Found'})
+            return self.reply(200, issue)
+
+    return Handler
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Differential fuzzer for the streaming JSON reader in tool_results.py
+
+Builds random tool result documents, serializes them in several layouts and
+checks that iter_array, read in chunks down to a single character, yields
+exactly what json.loads finds under each top-level key. Truncated documents
+must raise ValueError rather than yield a partial array.
+"""
+
+import argparse
+import io
+import json
+import random
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / '.github' / 'scripts'))
+
+from tool_results import iter_array
+
+CHUNK_SIZES = (1, 2, 3, 5, 7, 64, 4096)
+
+# Values that stress the reader: numbers that can be cut anywhere, escapes,
+# non-ASCII text and the literals
+SCALARS = [
+    0, 1, -1, 7, 10, 123456789012345678901234567890, -0.5, 3.25, 1e-7, -12.5e30, 6.02e23,
+    True, False, None, '', 'a', 'path/to/file.py', 'quote " and backslash \\',
+    'line\nbreak\ttab', 'é ü ß', ' ', '😀', '[{,:}]', '1.5e10'
+]
+
+LAYOUTS = [
+    {},
+    {'indent': 2},
+    {'indent': '\t'},
+    {'separators': (',', ':')},
+    {'separators': (' , ', ' : ')},
+    {'ensure_ascii': False},
+    {'ensure_ascii': False, 'indent': 1},
+]
+
+
+def random_value(rng, depth=0):
+    roll = rng.random()
+    if depth > 3 or roll < 0.4:
+        return rng.choice(SCALARS)
+    if roll < 0.7:
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return {rng.choice(['k', 'path', 'results', 'é"', '']) + str(i): random_value(rng, depth + 1)
+            for i in range(rng.randint(0, 4))}
+
+
+def random_document(rng):
+    """An object with a results array somewhere among other top-level keys"""
+    keys = ['errors', 'results', 'paths', 'version', 'findings', 'metrics']
+    rng.shuffle(keys)
+    document = {}
+    for key in keys[:rng.randint(1, len(keys))]:
+        if rng.random() < 0.7:
+            document[key] = [random_value(rng) for _ in range(rng.randint(0, 8))]
+        else:
+            document[key] = random_value(rng)
+    return document
+
+
+def expected_items(document, key):
+    """What iter_array must yield: the array under ``key``, or nothing if it is absent or not an array"""
+    value = document.get(key)
+    return value if isinstance(value, list) else []
+
+
+def check_document(text, rng):
+    """Return a description of the first disagreement for one serialized document, or None"""
+    document = json.loads(text)
+    for key in list(document) + ['missing']:
+        expected = expected_items(document, key)
+        for chunk_size in CHUNK_SIZES:
+            try:
+                items = list(iter_array(io.StringIO(text), key, chunk_size))
+            except ValueError as e:
+                return f"key {key!r}, chunk size {chunk_size}: {e}"
+            if items != expected:
+                return f"key {key!r}, chunk size {chunk_size}: got {items!r}, expected {expected!r}"
+
+    # Cut anywhere, the reader either fails or has already seen the whole array
+    cut = rng.randrange(len(text))
+    for key in document:
+        expected = expected_items(document, key)
+        for chunk_size in (1, 64):
+            try:
+                items = list(iter_array(io.StringIO(text[:cut]), key, chunk_size))
+            except ValueError:
+                continue
+            if items != expected:
+                return (f"key {key!r}, chunk size {chunk_size}, cut at {cut}: "
+                        f"got {items!r} instead of an error or {expected!r}")
+    return None
+
+
+def fuzz(iterations, seed):
+    """Return (text, problem) for the first failing document, or None"""
+    rng = random.Random(seed)
+    for _ in range(iterations):
+        document = random_document(rng)
+        text = json.dumps(document, **rng.choice(LAYOUTS))
+        if rng.random() < 0.3:
+            text = rng.choice([' ', '\n', '\r\n ']) + text + rng.choice(['', '\n', '  \n'])
+        problem = check_document(text, rng)
+        if problem:
+            return text, problem
+    return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Fuzz the streaming JSON reader against json.loads')
+    parser.add_argument('--iterations', type=int, default=200,
+                        help='random documents to check (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=21,
+                        help='random seed (default: %(default)s)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    failure = fuzz(args.iterations, args.seed)
+    if failure:
+        text, problem = failure
+        print(f"❌ iter_array differs from json.loads ({problem}) on:")
+        print(text)
+        return 1
+
+    print(f"✅ {args.iterations} documents streamed identically to json.loads "
+          f"at chunk sizes {', '.join(map(str, CHUNK_SIZES))}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
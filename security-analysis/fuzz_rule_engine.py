@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Differential fuzzer for the scanner's RuleEngine
+
+Scans random snippets built from rule keywords and punctuation, and checks
+that the keyword prefilter plus the combined alternation report exactly the
+matches a separate re.finditer pass per rule finds, for text and for bytes.
+"""
+
+import argparse
+import random
+import re
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / '.github' / 'scripts'))
+
+import security_scanner
+from security_scanner import RuleEngine, SecurityChecker, required_literals
+
+# Rules the configured set lacks: ones that cannot be merged (backreference,
+# named group), a global flag group, and rules overlapping each other
+EXTRA_RULES = {
+    'fuzz_backreference': r'(ab)\1',
+    'fuzz_named_group': r'(?P<word>tok)en',
+    'fuzz_ignore_case': r'(?i)key',
+    'fuzz_overlap': r'ey\s*=',
+    'fuzz_empty_match': r'x*',
+    'fuzz_multiline': r'^\s*import\s+\w+$',
+    'fuzz_non_ascii': r'pässword\s*=',
+}
+
+FILLER = [' ', '  ', '\n', '\r\n', '\t', '=', ':', '"', "'", '(', ')', ';', '+', '$', '.', '/',
+          '\\', 'abab', 'token', 'KEY', 'Key =', 'x', 'xx', 'import os', 'ÄÖ', 'pässword = ', 'ß']
+
+
+def fuzz_rules():
+    """Configured rules plus EXTRA_RULES, in the shape RuleEngine expects"""
+    patterns = {name: dict(config) for name, config in SecurityChecker().patterns.items()}
+    for name, pattern in EXTRA_RULES.items():
+        patterns[name] = {'pattern': pattern, 'severity': 'LOW', 'cwe': 'CWE-0', 'description': name}
+    return patterns
+
+
+def vocabulary(patterns):
+    """Rule keywords in a few casings, so the prefilter both keeps and drops rules"""
+    words = list(FILLER)
+    for config in patterns.values():
+        for literal in required_literals(config['pattern']) or ():
+            words.extend([literal, literal.upper(), literal.title()])
+    return words
+
+
+def expected_matches(patterns, content, binary):
+    """One re.finditer pass per rule: the reference the engine must reproduce"""
+    expected = []
+    for name, config in patterns.items():
+        pattern = config['pattern'].encode('utf-8') if binary else config['pattern']
+        spans = [(m.start(), m.end(), m.group(0)) for m in re.finditer(pattern, content, re.MULTILINE)]
+        expected.append((name, spans))
+    return expected
+
+
+def engine_matches(engine, content, prefilter):
+    return [
+        (name, [(m.start(), m.end(), m.group(0)) for m in matches])
+        for name, _, matches in engine.scan(content, prefilter=prefilter)
+    ]
+
+
+def fuzz(iterations, seed, max_tokens=60):
+    """Return the first snippet where engine and reference disagree, or None"""
+    rng = random.Random(seed)
+    patterns = fuzz_rules()
+    words = vocabulary(patterns)
+    engines = {binary: RuleEngine(patterns, binary=binary) for binary in (False, True)}
+
+    for _ in range(iterations):
+        text = ''.join(rng.choice(words) for _ in range(rng.randint(0, max_tokens)))
+        for binary, engine in engines.items():
+            content = text.encode('utf-8') if binary else text
+            expected = expected_matches(patterns, content, binary)
+            for prefilter in (True, False):
+                if engine_matches(engine, content, prefilter) != expected:
+                    return content, binary, prefilter
+    return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Fuzz the combined rule matcher against per-rule matching')
+    parser.add_argument('--iterations', type=int, default=2000,
+                        help='random snippets to check (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=7,
+                        help='random seed (default: %(default)s)')
+    parser.add_argument('--chunk-size', type=int, default=16,
+                        help='prefilter chunk size for bytes, small so keywords straddle chunks '
+                             '(default: %(default)s)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    security_scanner.PREFILTER_CHUNK_SIZE = args.chunk_size
+
+    failure = fuzz(args.iterations, args.seed)
+    if failure:
+        content, binary, prefilter = failure
+        print(f"❌ RuleEngine.scan differs from per-rule matching "
+              f"({'bytes' if binary else 'text'}, prefilter {'on' if prefilter else 'off'}) on:")
+        print(repr(content))
+        return 1
+
+    print(f"✅ {args.iterations} snippets matched per-rule re.finditer in text and bytes mode")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Behavior tests for the diff-scoped scan (--diff)
+Builds a scratch git repository and scans it from the top level and from a subdirectory
+"""
+
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+
+# Add the scripts directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.github', 'scripts'))
+
+GIT_ENVIRONMENT = {
+    'GIT_AUTHOR_NAME': 'Test', 'GIT_AUTHOR_EMAIL': 'test@example.com',
+    'GIT_COMMITTER_NAME': 'Test', 'GIT_COMMITTER_EMAIL': 'test@example.com',
+    'GIT_CONFIG_NOSYSTEM': '1', 'HOME': tempfile.gettempdir()
+}
+
+# Each line matches the insecure_http rule
+INSECURE = 'url = "http://example.com/api"\n'
+
+
+def git(repo, *args):
+    subprocess.run(['git', *args], cwd=repo, env={**os.environ, **GIT_ENVIRONMENT},
+                   check=True, capture_output=True)
+
+
+def write(repo, path, content):
+    full_path = os.path.join(repo, path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    with open(full_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+@contextlib.contextmanager
+def scratch_repository():
+    """A repository whose feature branch changes files in sub/ and other/ after main moved on
+
+    From the merge base, the feature branch appends two lines to sub/app.py,
+    moves other/moved.py to sub/inner/ünïcode name.py with a line added, only
+    removes lines from other/lib.py and deletes other/gone.py. main later
+    changes sub/main_only.py, which the diff must not include.
+    """
+    with tempfile.TemporaryDirectory() as repo:
+        git(repo, 'init', '-q')
+        git(repo, 'symbolic-ref', 'HEAD', 'refs/heads/main')
+        write(repo, 'sub/app.py', INSECURE + 'print("ok")\n')
+        write(repo, 'sub/main_only.py', 'x = 1\n')
+        write(repo, 'other/lib.py', INSECURE + 'a = 1\nb = 2\n')
+        write(repo, 'other/moved.py', INSECURE + 'a = 1\nb = 2\n')
+        write(repo, 'other/gone.py', 'import sys\n')
+        git(repo, 'add', '-A')
+        git(repo, 'commit', '-q', '-m', 'base')
+
+        git(repo, 'checkout', '-q', '-b', 'feature')
+        write(repo, 'sub/app.py', INSECURE + 'print("ok")\n' + INSECURE + INSECURE)
+        write(repo, 'other/lib.py', INSECURE + 'a = 1\n')
+        os.remove(os.path.join(repo, 'other/gone.py'))
+        os.remove(os.path.join(repo, 'other/moved.py'))
+        write(repo, 'sub/inner/ünïcode name.py', INSECURE + 'a = 1\nb = 2\nc = 3\n')
+        git(repo, 'add', '-A')
+        git(repo, 'commit', '-q', '-m', 'feature')
+
+        git(repo, 'checkout', '-q', 'main')
+        write(repo, 'sub/main_only.py', INSECURE)
+        git(repo, 'commit', '-q', '-am', 'main moves on')
+        git(repo, 'checkout', '-q', 'feature')
+        yield repo
+
+
+@contextlib.contextmanager
+def working_directory(path):
+    saved = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(saved)
+
+
+def diff_findings(whole_file=False):
+    """(file, line) of every finding of a --diff main scan of the current directory"""
+    from security_scanner import SecurityChecker
+
+    checker = SecurityChecker()
+    with contextlib.redirect_stdout(io.StringIO()):
+        checker.scan_diff('main', whole_file=whole_file)
+        report = checker.generate_report()
+    return sorted((finding['file'], finding['line']) for finding in report['findings'])
+
+
+def test_changed_lines():
+    """changed_lines maps files to added lines since the merge base, relative to the current directory"""
+    print("🧾 Testing changed lines from the top level and from a subdirectory...")
+    from diff_scope import changed_lines
+
+    with scratch_repository() as repo:
+        with working_directory(repo):
+            changes = changed_lines('main')
+        assert changes == {
+            'sub/app.py': {3, 4},
+            'sub/inner/ünïcode name.py': {1, 2, 3, 4},
+            'other/lib.py': set()
+        }, changes
+
+        with working_directory(os.path.join(repo, 'sub')):
+            changes = changed_lines('main')
+        # A move into the directory looks the same from here as from the top level
+        assert changes == {'app.py': {3, 4}, 'inner/ünïcode name.py': {1, 2, 3, 4}}, changes
+    return True
+
+
+def test_scan_diff():
+    """--diff reports findings on changed lines only, with paths relative to where it runs"""
+    print("🔀 Testing diff-scoped scans...")
+
+    with scratch_repository() as repo:
+        with working_directory(repo):
+            findings = diff_findings()
+            assert findings == [('sub/app.py', 3), ('sub/app.py', 4), ('sub/inner/ünïcode name.py', 1)], findings
+            # The whole changed files, but still not files the branch did not touch
+            findings = diff_findings(whole_file=True)
+            assert findings == [
+                ('other/lib.py', 1), ('sub/app.py', 1), ('sub/app.py', 3), ('sub/app.py', 4),
+                ('sub/inner/ünïcode name.py', 1)
+            ], findings
+
+        with working_directory(os.path.join(repo, 'sub')):
+            findings = diff_findings()
+            assert findings == [('app.py', 3), ('app.py', 4), ('inner/ünïcode name.py', 1)], findings
+    return True
+
+
+def main():
+    """Main test function"""
+    print("🛡️ Diff Scope Test Suite")
+    print("=" * 60)
+
+    tests = [
+        ("Changed Lines", test_changed_lines),
+        ("Diff Scan", test_scan_diff)
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                print(f"✅ {test_name} test PASSED")
+                passed += 1
+            else:
+                print(f"❌ {test_name} test FAILED")
+        except Exception as e:
+            print(f"❌ {test_name} test ERROR: {type(e).__name__}: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"🏁 Test Results: {passed}/{total} tests passed")
+    return passed == total
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Behavior tests for the GitHub issue pipeline
+Runs create_security_issues.py against fake_github_server.py and checks the rate limiter
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Add the scripts directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.github', 'scripts'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Keeps the 429 backoff of the end-to-end runs short
+TEST_BACKOFF = 0.2
+
+
+class FakeResponse:
+    """The parts of a requests.Response that RateLimiter.update reads"""
+
+    def __init__(self, status_code, headers=None, text=''):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = text
+
+
+def pause_of(limiter):
+    """Seconds from now until the limiter lets requests through again"""
+    return limiter.resume_at - time.monotonic()
+
+
+def run_issue_creation(github, findings, workers):
+    """Run create_security_issues.main() in a scratch directory; returns (exit value, summary, output)"""
+    import create_security_issues
+    import github_api
+
+    environment = {
+        'GITHUB_TOKEN': 'test-token',
+        'REPO_OWNER': github.repository.split('/')[0],
+        'REPO_NAME': github.repository.split('/')[1],
+        'GITHUB_API_URL': github.url,
+        'SECURITY_ISSUE_WORKERS': str(workers),
+        'SECURITY_ISSUE_WRITE_INTERVAL': '0'
+    }
+    saved_environment = {name: os.environ.get(name) for name in list(environment) + ['SECURITY_ISSUE_INDEX']}
+    saved_defaults = github_api.RateLimiter.__init__.__defaults__
+    saved_directory = os.getcwd()
+    output = io.StringIO()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        try:
+            os.environ.update(environment)
+            os.environ.pop('SECURITY_ISSUE_INDEX', None)
+            github_api.RateLimiter.__init__.__defaults__ = (0.0, TEST_BACKOFF)
+            os.chdir(scratch)
+            with open('custom-security-results.json', 'w') as f:
+                json.dump({'findings': findings}, f)
+
+            with contextlib.redirect_stdout(output):
+                result = create_security_issues.main()
+
+            summary = None
+            if os.path.exists('created-issues-summary.json'):
+                with open('created-issues-summary.json') as f:
+                    summary = json.load(f)
+        finally:
+            os.chdir(saved_directory)
+            github_api.RateLimiter.__init__.__defaults__ = saved_defaults
+            for name, value in saved_environment.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+    return result, summary, output.getvalue()
+
+
+def test_summary_order():
+    """created-issues-summary.json lists issues in group order whatever the worker count"""
+    print("📋 Testing summary order with parallel workers...")
+    from fake_github_server import FakeGitHub
+
+    findings = [{
+        'file': f'src/module{i}.py',
+        'rule': f'rule_{i % 3}',
+        'line': i + 1,
+        'severity': ('HIGH', 'MEDIUM', 'LOW')[i % 3],
+        'description': f'Finding {i}',
+        'match': f'match {i}'
+    } for i in range(40)]
+    # Exact duplicates collapse into their group
+    findings += findings[:5]
+
+    titles = {}
+    for workers in (1, 8):
+        with FakeGitHub(existing=10, latency=0.05, limit_every=15) as github:
+            result, summary, output = run_issue_creation(github, findings, workers)
+            assert result == 40, f"expected 40 issues with {workers} workers, got {result}:\n{output}"
+            assert summary['total_created'] == 40
+            assert github.rate_limits() > 0, "the fake server injected no rate limits"
+            assert 'rate limit hit' in output, "rate-limited requests were not retried"
+            if workers > 1:
+                assert github.max_in_flight > 1, "issue writes did not overlap"
+            titles[workers] = [issue['title'] for issue in summary['issues']]
+            print(f"  {workers} workers: {len(titles[workers])} issues, {github.rate_limits()} rate limits, "
+                  f"{github.max_in_flight} writes in flight at most")
+
+    assert titles[1] == titles[8], "summary order depends on the number of workers"
+    assert len(set(titles[1])) == len(titles[1])
+    return True
+
+
+def test_retry_after():
+    """A 403 or 429 with Retry-After pauses every thread for that long and is retried"""
+    print("⏳ Testing Retry-After handling...")
+    from github_api import RateLimiter
+
+    limiter = RateLimiter(0.0, backoff=60.0)
+    response = FakeResponse(403, {'Retry-After': '3'}, 'You have exceeded a secondary rate limit')
+    assert limiter.update(response) is True
+    assert 2.5 < pause_of(limiter) <= 3.0, pause_of(limiter)
+
+    # Retry-After wins over the exponential backoff on later attempts too
+    limiter = RateLimiter(0.0, backoff=60.0)
+    assert limiter.update(FakeResponse(429, {'Retry-After': '2'}), attempt=3) is True
+    assert 1.5 < pause_of(limiter) <= 2.0, pause_of(limiter)
+
+    # A pause already in place is never shortened
+    assert limiter.update(FakeResponse(429, {'Retry-After': '0'})) is True
+    assert pause_of(limiter) > 1.5
+
+    # The pause holds requests back
+    limiter = RateLimiter(0.0)
+    limiter.update(FakeResponse(429, {'Retry-After': '0.3'}))
+    started = time.monotonic()
+    limiter.wait()
+    assert time.monotonic() - started >= 0.25
+    return True
+
+
+def test_rate_limit_reset():
+    """An exhausted primary limit pauses until X-RateLimit-Reset, even on a successful response"""
+    print("🕛 Testing X-RateLimit-Reset handling...")
+    from github_api import RateLimiter
+
+    reset = str(int(time.time()) + 5)
+    exhausted = {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': reset}
+
+    limiter = RateLimiter(0.0)
+    assert limiter.update(FakeResponse(200, exhausted)) is False, "a successful response was retried"
+    expected = float(reset) - time.time() + 1.0
+    assert abs(pause_of(limiter) - expected) < 0.5, (pause_of(limiter), expected)
+
+    limiter = RateLimiter(0.0, backoff=60.0)
+    assert limiter.update(FakeResponse(403, exhausted, 'API rate limit exceeded')) is True
+    assert abs(pause_of(limiter) - expected) < 0.5, "a primary limit fell back to the backoff"
+
+    # Quota left: no pause at all
+    limiter = RateLimiter(0.0)
+    assert limiter.update(FakeResponse(200, {'X-RateLimit-Remaining': '10', 'X-RateLimit-Reset': reset})) is False
+    assert pause_of(limiter) <= 0
+
+    # A reset time already in the past still waits the one second margin
+    limiter = RateLimiter(0.0)
+    limiter.update(FakeResponse(403, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(int(time.time()) - 30)}))
+    assert 0.5 < pause_of(limiter) <= 1.0, pause_of(limiter)
+    return True
+
+
+def test_exponential_backoff():
+    """Rate limits without headers back off exponentially; a plain 403 is not retried"""
+    print("📈 Testing exponential backoff...")
+    from github_api import RateLimiter
+
+    for attempt in range(4):
+        limiter = RateLimiter(0.0, backoff=1.5)
+        assert limiter.update(FakeResponse(429), attempt) is True
+        expected = 1.5 * 2 ** attempt
+        assert expected - 0.5 < pause_of(limiter) <= expected, (attempt, pause_of(limiter))
+
+    # A secondary limit reported as a 403 with no headers
+    limiter = RateLimiter(0.0, backoff=1.5)
+    assert limiter.update(FakeResponse(403, {}, 'You have exceeded a secondary rate limit'), 2) is True
+    assert 5.5 < pause_of(limiter) <= 6.0, pause_of(limiter)
+
+    limiter = RateLimiter(0.0, backoff=1.5)
+    assert limiter.update(FakeResponse(403, {}, 'Resource not accessible by integration')) is False
+    assert pause_of(limiter) <= 0, "a permission error paused the client"
+    return True
+
+
+def test_group_key_matches_issue_key():
+    """A (rule, file) group gets the key issues created one per finding were indexed under"""
+    print("🔑 Testing group keys against issue keys...")
+    from finding_groups import group_findings
+    from issue_index import issue_key
+
+    paths = ['src/app.py', './src/app.py', 'src\\app.py', 'a b/ünï.py', './x/../y.py', '.hidden/z.py']
+    findings = [{'file': path, 'rule': 'hardcoded_secret', 'line': 1} for path in paths]
+    for group in group_findings(findings, ('rule', 'file')):
+        for finding in group.findings:
+            key = issue_key(finding['file'], finding['rule'])
+            assert group.key == key, f"{finding['file']!r}: group key {group.key} != issue key {key}"
+    return True
+
+
+def main():
+    """Main test function"""
+    print("🛡️ Issue Pipeline Test Suite")
+    print("=" * 60)
+
+    tests = [
+        ("Group Keys", test_group_key_matches_issue_key),
+        ("Summary Order", test_summary_order),
+        ("Retry-After", test_retry_after),
+        ("X-RateLimit-Reset", test_rate_limit_reset),
+        ("Exponential Backoff", test_exponential_backoff)
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                print(f"✅ {test_name} test PASSED")
+                passed += 1
+            else:
+                print(f"❌ {test_name} test FAILED")
+        except Exception as e:
+            print(f"❌ {test_name} test ERROR: {type(e).__name__}: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"🏁 Test Results: {passed}/{total} tests passed")
+    return passed == total
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)